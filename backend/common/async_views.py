@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+from rest_framework.routers import DefaultRouter
+
+from .middleware import record_queries
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.ASYNC_VIEW_WORKERS,
+        thread_name_prefix='async-views',
+    )
+
+
+def call_view(view, request, *args, **kwargs):
+    close_old_connections()
+    try:
+        with record_queries(getattr(request, 'query_recorder', None)):
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response = response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    sync_view = sync_to_async(view)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_view(request, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor(), partial(call_view, view, request, *args, **kwargs)
+        )
+    return wrapper
+
+
+class AsyncDefaultRouter(DefaultRouter):
+    # Через пул потоков идут только GET-запросы к этим действиям.
+    # Остальные маршруты, в том числе потоковая выгрузка списка покупок,
+    # остаются синхронными.
+    async_actions = ('list', 'retrieve', 'subscriptions')
+
+    def get_urls(self):
+        urls = super().get_urls()
+        if not settings.ASYNC_VIEWS:
+            return urls
+        return [
+            URLPattern(url.pattern, async_view(url.callback),
+                       url.default_args, url.name)
+            if self.is_async_route(url) else url
+            for url in urls
+        ]
+
+    def is_async_route(self, url):
+        actions = getattr(url.callback, 'actions', None) or {}
+        return actions.get('get') in self.async_actions
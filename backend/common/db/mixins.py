@@ -0,0 +1,37 @@
+import time
+
+
+class ConnectionHealthMixin:
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_enabled = self.settings_dict.get(
+            'CONN_HEALTH_CHECKS', False
+        )
+        self.health_check_done = False
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        self.health_check_done = True
+        duration = time.perf_counter() - started
+        for wrapper in self.execute_wrappers:
+            record_connect = getattr(wrapper, 'record_connect', None)
+            if record_connect is not None:
+                record_connect(duration)
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        if (self.connection is None or not self.health_check_enabled
+                or self.health_check_done):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,113 @@
+import os
+import threading
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+from ..mixins import ConnectionHealthMixin
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """Пул, который ждёт освобождения соединения вместо PoolError."""
+
+    def __init__(self, minconn, maxconn, *args, timeout=None, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.timeout = timeout
+
+    def getconn(self, key=None):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolError('Нет свободных соединений в пуле за '
+                            f'{self.timeout} с')
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        self.slots.release()
+
+
+class DatabaseWrapper(ConnectionHealthMixin, base.DatabaseWrapper):
+    pools = {}
+    pools_pid = os.getpid()
+    pools_lock = threading.Lock()
+    # Пулы, унаследованные от родителя при fork. Ссылки держим, чтобы
+    # сборщик мусора не закрыл чужие сокеты и не оборвал соединения
+    # родительского процесса.
+    inherited_pools = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_options = self.settings_dict.get('POOL')
+        self.pool = None
+
+    def get_pool(self, conn_params):
+        with self.pools_lock:
+            if DatabaseWrapper.pools_pid != os.getpid():
+                DatabaseWrapper.inherited_pools.extend(self.pools.values())
+                DatabaseWrapper.pools = {}
+                DatabaseWrapper.pools_pid = os.getpid()
+            if self.alias not in self.pools:
+                self.pools[self.alias] = BlockingConnectionPool(
+                    self.pool_options.get('min_size', 1),
+                    self.pool_options.get('max_size', 10),
+                    timeout=self.pool_options.get('timeout'),
+                    **conn_params,
+                )
+            return self.pools[self.alias]
+
+    def close_pool(self):
+        """Закрывает пул алиаса, например в мастер-процессе перед fork."""
+        with self.pools_lock:
+            if DatabaseWrapper.pools_pid != os.getpid():
+                return
+            pool = self.pools.pop(self.alias, None)
+        if pool is not None and not pool.closed:
+            pool.closeall()
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options:
+            return super().get_new_connection(conn_params)
+        pool = self.get_pool(conn_params)
+        connection = pool.getconn()
+        if self.health_check_enabled and not self.check_pooled(connection):
+            pool.putconn(connection, close=True)
+            connection = pool.getconn()
+        try:
+            options = self.settings_dict['OPTIONS']
+            self.isolation_level = options.get('isolation_level',
+                                               connection.isolation_level)
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+            psycopg2.extras.register_default_jsonb(conn_or_curs=connection,
+                                                   loads=lambda value: value)
+        except psycopg2.Error:
+            pool.putconn(connection, close=True)
+            raise
+        self.pool = pool
+        return connection
+
+    def check_pooled(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _close(self):
+        pool, self.pool = self.pool, None
+        if pool is None or pool.closed or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            try:
+                pool.putconn(self.connection,
+                             close=bool(self.connection.closed))
+            except psycopg2.Error:
+                pool.putconn(self.connection, close=True)
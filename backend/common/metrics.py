@@ -0,0 +1,114 @@
+import math
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.core.cache import caches
+
+WORKERS_KEY = 'request-metrics:workers'
+
+
+def get_metrics_cache():
+    return caches[settings.REQUEST_METRICS_CACHE_ALIAS]
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.flushed_at = 0
+
+    def get_key(self):
+        return 'request-metrics:{0}:{1}'.format(socket.gethostname(),
+                                                os.getpid())
+
+    def record(self, view, duration, db_duration, connect_duration, queries,
+               over_budget):
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = {
+                    'requests': 0,
+                    'over_budget': 0,
+                    'samples': deque(maxlen=settings.REQUEST_METRICS_SAMPLES),
+                }
+            stats['requests'] += 1
+            stats['over_budget'] += over_budget
+            stats['samples'].append(
+                (duration, db_duration, connect_duration, queries)
+            )
+
+            now = time.monotonic()
+            if now - self.flushed_at < settings.REQUEST_METRICS_FLUSH_INTERVAL:
+                return
+            self.flushed_at = now
+            snapshot = {
+                view: dict(stats, samples=list(stats['samples']))
+                for view, stats in self.views.items()
+            }
+        self.flush(snapshot)
+
+    def flush(self, snapshot):
+        cache = get_metrics_cache()
+        key = self.get_key()
+        cache.set(key, snapshot,
+                  settings.REQUEST_METRICS_FLUSH_INTERVAL * 30)
+        workers = cache.get(WORKERS_KEY, set())
+        if key not in workers:
+            cache.set(WORKERS_KEY, workers | {key}, None)
+
+
+request_metrics = RequestMetrics()
+
+
+def get_summary():
+    cache = get_metrics_cache()
+    workers = cache.get(WORKERS_KEY, set())
+    snapshots = cache.get_many(workers)
+    if set(snapshots) != workers:
+        cache.set(WORKERS_KEY, set(snapshots), None)
+
+    merged = {}
+    for snapshot in snapshots.values():
+        for view, stats in snapshot.items():
+            totals = merged.setdefault(view, {
+                'requests': 0, 'over_budget': 0, 'samples': [],
+            })
+            totals['requests'] += stats['requests']
+            totals['over_budget'] += stats['over_budget']
+            totals['samples'].extend(stats['samples'])
+
+    summary = OrderedDict()
+    for view, totals in sorted(merged.items()):
+        durations, db_durations, connect_durations, queries = zip(
+            *totals['samples']
+        )
+        summary[view] = OrderedDict([
+            ('requests', totals['requests']),
+            ('over_budget', totals['over_budget']),
+            ('p50_ms', round(percentile(durations, 50), 1)),
+            ('p95_ms', round(percentile(durations, 95), 1)),
+            ('db_ms', round(sum(db_durations) / len(db_durations), 1)),
+            ('connect_ms', round(
+                sum(connect_durations) / len(connect_durations), 1
+            )),
+            ('queries', round(sum(queries) / len(queries), 1)),
+            ('max_queries', max(queries)),
+        ])
+    return summary
+
+
+def reset_summary():
+    cache = get_metrics_cache()
+    cache.delete_many(cache.get(WORKERS_KEY, set()))
+    cache.delete(WORKERS_KEY)
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import request_metrics
+
+logger = logging.getLogger('foodram.requests')
+
+
+class QueryRecorder:
+
+    def __init__(self):
+        self.duration = 0.0
+        self.connect_duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    def record_connect(self, duration):
+        self.connect_duration += duration
+
+    @property
+    def count(self):
+        return sum(self.statements.values())
+
+    def get_duplicates(self):
+        return {
+            hashlib.md5(sql.encode()).hexdigest()[:12]: {
+                'count': count,
+                'sql': sql[:200],
+            }
+            for sql, count in self.statements.items()
+            if count > 1
+        }
+
+
+@contextmanager
+def record_queries(recorder):
+    with ExitStack() as stack:
+        if recorder is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder = request.query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        with record_queries(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        request.query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, started)
+
+    def finish(self, request, response, started):
+        recorder = request.query_recorder
+        duration = (time.perf_counter() - started) * 1000
+        db_duration = recorder.duration * 1000
+        connect_duration = recorder.connect_duration * 1000
+
+        view = self.get_view_name(request)
+        over_budget = (
+            recorder.count > settings.REQUEST_METRICS_QUERY_BUDGET
+            or duration > settings.REQUEST_METRICS_LATENCY_BUDGET
+        )
+        response['Server-Timing'] = (
+            f'app;dur={duration:.1f}, '
+            f'db;dur={db_duration:.1f};desc="{recorder.count} queries", '
+            f'db-connect;dur={connect_duration:.1f}'
+        )
+        self.log(request, response, view, duration, db_duration,
+                 connect_duration, recorder, over_budget)
+        request_metrics.record(view, duration, db_duration, connect_duration,
+                               recorder.count, over_budget)
+        return response
+
+    def get_view_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        return match.view_name or match._func_path
+
+    def log(self, request, response, view, duration, db_duration,
+            connect_duration, recorder, over_budget):
+        level = logging.WARNING if over_budget else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(level, json.dumps({
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration, 1),
+            'db_ms': round(db_duration, 1),
+            'connect_ms': round(connect_duration, 1),
+            'queries': recorder.count,
+            'duplicates': recorder.get_duplicates(),
+            'over_budget': over_budget,
+        }, ensure_ascii=False))
@@ -1,7 +1,192 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+class CachedCountPaginator(Paginator):
+    count_is_exact = True
+    count_is_fresh = False
+
+    def __init__(self, object_list, per_page, count_cache_key=None,
+                 count_cache_timeout=None, count_estimate_threshold=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_cache_timeout = count_cache_timeout
+        self.count_estimate_threshold = count_estimate_threshold
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is not None:
+            cached = cache.get(self.count_cache_key)
+            if cached is not None:
+                self.count_is_exact = cached[1]
+                return cached[0]
+
+        count = self.get_estimated_count()
+        if count is None or count <= self.count_estimate_threshold:
+            count = super().count
+            self.count_is_fresh = True
+        else:
+            self.count_is_exact = False
+
+        if self.count_cache_key is not None:
+            cache.set(self.count_cache_key, (count, self.count_is_exact),
+                      self.count_cache_timeout)
+        return count
+
+    def validate_number(self, number):
+        if self.count_is_fresh:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        count = self.count
+        if self.count_is_fresh:
+            return super().page(number)
+
+        # Кэшированный или оценочный count может отставать от таблицы,
+        # поэтому страницу режем по per_page, а не по count. Лишняя строка
+        # показывает, есть ли следующая страница.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not rows and number > 1:
+            raise EmptyPage('Страница не содержит результатов')
+
+        seen = bottom + len(rows)
+        if has_next:
+            count = max(count, seen + 1)
+        else:
+            count = seen
+            self.count_is_exact = True
+        if count != self.count and self.count_cache_key is not None:
+            cache.set(self.count_cache_key, (count, self.count_is_exact),
+                      self.count_cache_timeout)
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+        return self._get_page(rows, number, self)
+
+    def get_estimated_count(self):
+        queryset = self.object_list
+        if (self.count_estimate_threshold is None
+                or not hasattr(queryset, 'query')
+                or connections[queryset.db].vendor != 'postgresql'):
+            return None
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+    ordering = ('-pub_date', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        for backend in getattr(view, 'filter_backends', ()):
+            ordering_param = getattr(backend, 'ordering_param', None)
+            if ordering_param in request.query_params:
+                raise ValidationError({
+                    ordering_param: 'Сортировка не поддерживается '
+                                    'вместе с курсорной пагинацией.'
+                })
+        return getattr(view, 'cursor_ordering', self.ordering)
 
 
 class PageLimitSetPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = 'limit'
     max_page_size = 1000
+    cursor_query_param = 'cursor'
+    cursor_pagination_class = KeysetPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request,
+                                                           view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response_schema(schema)
+        return super().get_paginated_response_schema(schema)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+class CachedCountPagination(PageLimitSetPagination):
+    count_cache_timeout = 60
+    count_estimate_threshold = 100000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            count_cache_key=self.get_count_cache_key(request, view),
+            count_cache_timeout=self.count_cache_timeout,
+            count_estimate_threshold=self.count_estimate_threshold,
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_cache_key(self, request, view=None):
+        uncached_params = getattr(view, 'uncached_count_params', ())
+        if any(param in request.query_params for param in uncached_params):
+            return None
+
+        ignored_params = (self.page_query_param, self.page_size_query_param,
+                          self.cursor_query_param)
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+            if key not in ignored_params
+        )
+        get_version = getattr(view, 'get_count_cache_version', None)
+        version = get_version() if get_version is not None else None
+        fingerprint = json.dumps([request.path, version, params])
+        return 'pagination-count:{0}'.format(
+            hashlib.md5(fingerprint.encode()).hexdigest()
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_exact', self.page.paginator.count_is_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
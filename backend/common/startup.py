@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import time
+
+PROCESS_LOCAL_CACHES = ('LocMemCache', 'FileBasedCache')
+
+
+def check_shared_caches(workers):
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    if workers < 2:
+        return
+    for alias in settings.SHARED_CACHE_ALIASES:
+        backend = settings.CACHES[alias]['BACKEND']
+        if backend.endswith(PROCESS_LOCAL_CACHES):
+            raise ImproperlyConfigured(
+                f'Кэш {alias!r} использует {backend}, который не подходит '
+                f'для {workers} воркеров. Укажите общий бэкенд (Redis, '
+                'Memcached) или запустите один воркер.'
+            )
+
+
+def get_worker_db_connections(threads):
+    from django.conf import settings
+
+    if settings.ASYNC_VIEWS:
+        # Пул async-представлений плюс поток для синхронного кода Django.
+        concurrency = settings.ASYNC_VIEW_WORKERS + 1
+    else:
+        concurrency = threads
+    pool = settings.DATABASES['default'].get('POOL')
+    if pool:
+        concurrency = min(concurrency, pool['max_size'])
+    return concurrency + settings.IMAGE_PIPELINE_WORKERS
+
+
+def check_db_connections(workers, threads):
+    from django.conf import settings
+    from django.db import connections
+
+    if connections['default'].vendor != 'postgresql':
+        return None
+    total = workers * get_worker_db_connections(threads)
+    if total <= settings.DB_MAX_CONNECTIONS:
+        return None
+    return (
+        f'{workers} воркеров могут открыть до {total} соединений с БД, '
+        f'а DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}. Уменьшите '
+        'GUNICORN_WORKERS или GUNICORN_THREADS либо включите DB_POOL с '
+        'меньшим DB_POOL_MAX_SIZE.'
+    )
+
+
+def warm_up():
+    from django.conf import settings
+    from django.core.cache import close_caches
+    from django.db import connections
+    from django.urls import get_resolver
+    from django.utils.module_loading import import_string
+
+    get_resolver().url_patterns
+    for callback in settings.WARM_UP_CALLBACKS:
+        import_string(callback)()
+    close_caches()
+    connections.close_all()
+    for connection in connections.all():
+        close_pool = getattr(connection, 'close_pool', None)
+        if close_pool is not None:
+            close_pool()
+
+
+def measure_startup(warm=True, url='/api/tags/'):
+    started = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+    get_wsgi_application()
+    timings = {'import_ms': time.perf_counter() - started}
+
+    started = time.perf_counter()
+    if warm:
+        warm_up()
+    timings['warm_up_ms'] = time.perf_counter() - started
+
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import override_settings
+    client = Client()
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS,
+                                          'testserver']):
+        for name in ('first_request_ms', 'second_request_ms'):
+            started = time.perf_counter()
+            client.get(url)
+            timings[name] = time.perf_counter() - started
+    return {name: round(value * 1000, 1) for name, value in timings.items()}
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodram.settings')
+    print(json.dumps(measure_startup(warm='--no-warm' not in sys.argv)))
@@ -9,8 +9,11 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from common.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodram.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', 'true')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+application = ASGIHandler()
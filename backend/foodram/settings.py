@@ -1,4 +1,6 @@
 import os
+import tempfile
+from datetime import timedelta
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -21,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_filters',
     'rest_framework',
     'rest_framework.authtoken',
@@ -32,6 +35,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -65,17 +69,132 @@ TEMPLATES = [
 WSGI_APPLICATION = 'foodram.wsgi.application'
 
 
+DB_BACKENDS = {
+    'django.db.backends.postgresql': 'common.db.postgresql',
+    'django.db.backends.sqlite3': 'common.db.sqlite3',
+}
+
+DB_ENGINE = os.environ.get('DB_ENGINE')
+
+DB_POOL = os.environ.get('DB_POOL', 'false').lower() in ('1', 'true', 'yes')
+
+# Сколько соединений с БД могут держать все воркеры вместе. Должно быть
+# меньше max_connections сервера (100 по умолчанию в PostgreSQL) с запасом
+# на миграции, админские и служебные подключения.
+DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 90))
+
 DATABASES = {
     'default': {
-        'ENGINE': os.environ.get('DB_ENGINE'),
+        'ENGINE': DB_BACKENDS.get(DB_ENGINE, DB_ENGINE),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(
+            os.environ.get('DB_CONN_MAX_AGE', 0 if DB_POOL else 60)
+        ),
+        'CONN_HEALTH_CHECKS': os.environ.get(
+            'DB_CONN_HEALTH_CHECKS', 'true'
+        ).lower() in ('1', 'true', 'yes'),
+        'POOL': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        } if DB_POOL else None,
     }
 }
 
+RECIPE_CACHE_ALIAS = 'recipes'
+
+RECIPE_CACHE_BACKEND = os.environ.get(
+    'RECIPE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    RECIPE_CACHE_ALIAS: {
+        'BACKEND': RECIPE_CACHE_BACKEND,
+        'LOCATION': os.environ.get('RECIPE_CACHE_LOCATION', 'recipes'),
+        'TIMEOUT': int(os.environ.get('RECIPE_CACHE_TIMEOUT', 300)),
+    },
+}
+
+if RECIPE_CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES[RECIPE_CACHE_ALIAS]['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+RECIPE_CACHE_STATS_FLUSH_INTERVAL = 10
+
+WARM_UP_CALLBACKS = ('recipes.catalog.load_catalog',)
+
+TAG_SLUGS_TIMEOUT = int(os.environ.get('TAG_SLUGS_TIMEOUT', 60))
+
+AUTH_TOKEN_CACHE_ALIAS = 'auth'
+
+AUTH_TOKEN_CACHE_BACKEND = os.environ.get(
+    'AUTH_TOKEN_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+)
+
+CACHES[AUTH_TOKEN_CACHE_ALIAS] = {
+    'BACKEND': AUTH_TOKEN_CACHE_BACKEND,
+    'LOCATION': os.environ.get('AUTH_TOKEN_CACHE_LOCATION', 'auth'),
+    'TIMEOUT': int(os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 60)),
+}
+
+if AUTH_TOKEN_CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES[AUTH_TOKEN_CACHE_ALIAS]['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+# Инвалидация токенов и версий рецептов должна быть видна всем воркерам,
+# поэтому при нескольких воркерах эти кэши не могут жить в памяти процесса.
+SHARED_CACHE_ALIASES = (RECIPE_CACHE_ALIAS, AUTH_TOKEN_CACHE_ALIAS)
+
+REQUEST_METRICS_ENABLED = os.environ.get(
+    'REQUEST_METRICS_ENABLED', 'false'
+).lower() in ('1', 'true', 'yes')
+REQUEST_METRICS_QUERY_BUDGET = int(
+    os.environ.get('REQUEST_METRICS_QUERY_BUDGET', 30)
+)
+REQUEST_METRICS_LATENCY_BUDGET = int(
+    os.environ.get('REQUEST_METRICS_LATENCY_BUDGET', 500)
+)
+REQUEST_METRICS_SAMPLES = 500
+REQUEST_METRICS_FLUSH_INTERVAL = 10
+REQUEST_METRICS_CACHE_ALIAS = 'metrics'
+CACHES[REQUEST_METRICS_CACHE_ALIAS] = {
+    'BACKEND': os.environ.get(
+        'REQUEST_METRICS_CACHE_BACKEND',
+        'django.core.cache.backends.filebased.FileBasedCache'
+    ),
+    'LOCATION': os.environ.get(
+        'REQUEST_METRICS_CACHE_LOCATION',
+        os.path.join(tempfile.gettempdir(), 'foodram-metrics')
+    ),
+    'TIMEOUT': None,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'foodram.requests': {
+            'handlers': ['requests'],
+            'level': os.environ.get('REQUEST_METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -97,7 +216,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'common.pagination.PageLimitSetPagination',
     'SEARCH_PARAM': 'name',
@@ -135,5 +254,21 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'django_media')
 
 MEDIA_URL = '/django_media/'
 
+ASYNC_VIEWS = os.environ.get(
+    'DJANGO_ASYNC_VIEWS', 'false'
+).lower() in ('1', 'true', 'yes')
+
+ASYNC_VIEW_WORKERS = int(os.environ.get('ASYNC_VIEW_WORKERS', 8))
+
+IMAGE_PIPELINE_WORKERS = int(os.environ.get('IMAGE_PIPELINE_WORKERS', 2))
+
+RECIPE_IMAGE_MAX_SIZE = 10 * 2 ** 20
+
+RECIPE_IMAGE_MAX_DIMENSION = 8000
+
+TRENDING_HALF_LIFE = timedelta(days=3)
+
+TRENDING_WINDOW = timedelta(days=14)
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,76 @@
+import gc
+import multiprocessing
+import os
+import time
+
+CONFIG_LOADED = time.perf_counter()
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# По умолчанию воркеров столько, чтобы их потоки не превысили
+# DB_MAX_CONNECTIONS: при CONN_MAX_AGE каждый поток, включая потоки
+# обработки изображений, держит своё соединение.
+worker_db_connections = threads + int(
+    os.environ.get('IMAGE_PIPELINE_WORKERS', 2)
+)
+workers = int(os.environ.get('GUNICORN_WORKERS', max(1, min(
+    multiprocessing.cpu_count() * 2 + 1,
+    int(os.environ.get('DB_MAX_CONNECTIONS', 90)) // worker_db_connections,
+))))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'foodram.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'foodram.wsgi:application'
+    worker_class = 'gthread'
+
+preload_app = os.environ.get(
+    'GUNICORN_PRELOAD', 'true'
+).lower() in ('1', 'true', 'yes')
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def on_starting(server):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodram.settings')
+    from common.startup import check_shared_caches
+    check_shared_caches(workers)
+
+
+def when_ready(server):
+    from common.startup import check_db_connections
+    warning = check_db_connections(workers, threads)
+    if warning:
+        server.log.warning(warning)
+    if preload_app:
+        from common.startup import warm_up
+        warm_up()
+        gc.freeze()
+    server.log.info(
+        'Приложение загружено за %.0f мс (workers=%s, threads=%s, %s)',
+        (time.perf_counter() - CONFIG_LOADED) * 1000, workers, threads,
+        worker_class,
+    )
+
+
+def post_fork(server, worker):
+    worker.boot_started = time.perf_counter()
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        from common.startup import warm_up
+        warm_up()
+    worker.log.info(
+        'Воркер %s запущен за %.0f мс', worker.pid,
+        (time.perf_counter() - worker.boot_started) * 1000,
+    )
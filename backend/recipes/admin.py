@@ -24,9 +24,10 @@ class RecipeAdmin(admin.ModelAdmin):
     ]
 
     def favorited(self, obj):
-        return Favorite.objects.filter(recipe=obj).count()
+        return obj.favorites_count
 
     favorited.short_description = 'В избранном'
+    favorited.admin_order_field = 'favorites_count'
 
 
 class TagAdmin(admin.ModelAdmin):
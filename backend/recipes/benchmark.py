@@ -0,0 +1,301 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from common.metrics import percentile
+from common.middleware import QueryRecorder, record_queries
+from common.pagination import KeysetPagination
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.pagination import Cursor
+from rest_framework.test import APIClient
+
+from .models import Ingredient, Purchase, Recipe, Tag, User
+
+
+def get_benchmark_user(email=None):
+    if email is not None:
+        return User.objects.get(email=email)
+    return User.objects.annotate(
+        purchases=Count('purchase_list')
+    ).order_by('-purchases', 'pk').first()
+
+
+def get_endpoints(user):
+    recipe = Recipe.objects.order_by('-pub_date', '-id').first()
+    tag = Tag.objects.exclude(slug=None).order_by('pk').first()
+    ingredient = Ingredient.objects.order_by('pk').first()
+    endpoints = OrderedDict([
+        ('tag_list', '/api/tags/'),
+        ('recipe_list', '/api/recipes/'),
+        ('recipe_list_cursor', '/api/recipes/?cursor='),
+        ('recipe_list_favorited', '/api/recipes/?is_favorited=1'),
+        ('recipe_list_author', f'/api/recipes/?author={user.pk}'),
+        ('subscriptions', '/api/users/subscriptions/?recipes_limit=3'),
+        ('download_shopping_cart', '/api/recipes/download_shopping_cart/'),
+    ])
+    if tag is not None:
+        endpoints['recipe_list_tags'] = f'/api/recipes/?tags={tag.slug}'
+    if recipe is not None:
+        endpoints['recipe_detail'] = f'/api/recipes/{recipe.pk}/'
+    if ingredient is not None:
+        endpoints['ingredient_search'] = (
+            f'/api/ingredients/?name={ingredient.name[:3]}'
+        )
+        endpoints['ingredient_search_fuzzy'] = (
+            f'/api/ingredients/?name={ingredient.name[:3]}&fuzzy=1'
+        )
+    return endpoints
+
+
+def get_client(user, host=None):
+    if host is None:
+        host = next((host for host in settings.ALLOWED_HOSTS
+                     if host != '*' and not host.startswith('.')),
+                    'testserver')
+    client = APIClient(HTTP_HOST=host)
+    client.credentials(HTTP_AUTHORIZATION=f'Token {get_token_key(user)}')
+    return client
+
+
+def get_token_key(user):
+    token, created = Token.objects.get_or_create(user=user)
+    return token.key
+
+
+def measure(client, url, repeat, warmup):
+    timings = []
+    queries = []
+    for attempt in range(warmup + repeat):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise ValueError(f'{url} вернул статус {response.status_code}')
+        if attempt >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+    return OrderedDict([
+        ('p50_ms', round(percentile(timings, 50), 2)),
+        ('p95_ms', round(percentile(timings, 95), 2)),
+        ('queries', max(queries)),
+    ])
+
+
+def run_benchmark(user, repeat=20, warmup=2, host=None, only=None):
+    client = get_client(user, host)
+    return OrderedDict(
+        (name, measure(client, url, repeat, warmup))
+        for name, url in get_endpoints(user).items()
+        if not only or name in only
+    )
+
+
+def get_cursor(positions):
+    compare = positions[-1]
+    for offset, position in enumerate(reversed(positions[:-1])):
+        if position != compare:
+            return Cursor(offset=offset, reverse=False, position=str(position))
+        compare = position
+    raise ValueError('Не удалось построить курсор: у всех рецептов '
+                     'предыдущей страницы одинаковая дата публикации.')
+
+
+def get_pagination_endpoints(page, limit):
+    endpoints = OrderedDict([
+        ('page_1', f'/api/recipes/?limit={limit}'),
+        (f'page_{page}', f'/api/recipes/?page={page}&limit={limit}'),
+        ('cursor_1', f'/api/recipes/?cursor=&limit={limit}'),
+    ])
+    if page == 1:
+        return endpoints
+
+    positions = list(Recipe.objects.order_by(
+        '-pub_date', '-id'
+    ).values_list('pub_date', flat=True)[
+        (page - 2) * limit:(page - 1) * limit + 1
+    ])
+    if len(positions) <= limit:
+        raise ValueError(f'В базе не больше {(page - 1) * limit} рецептов, '
+                         'сначала выполните generate_dataset.')
+    paginator = KeysetPagination()
+    paginator.base_url = f'/api/recipes/?limit={limit}'
+    endpoints[f'cursor_{page}'] = paginator.encode_cursor(
+        get_cursor(positions)
+    )
+    return endpoints
+
+
+def run_pagination_benchmark(user, page, limit, repeat=20, warmup=2,
+                             host=None):
+    client = get_client(user, host)
+    return OrderedDict(
+        (name, measure(client, url, repeat, warmup))
+        for name, url in get_pagination_endpoints(page, limit).items()
+    )
+
+
+def run_shopping_cart_benchmark(user, sizes, repeat=20, warmup=2,
+                                host=None):
+    recipe_ids = list(Recipe.objects.order_by('pk').values_list(
+        'pk', flat=True
+    )[:max(sizes)])
+    if len(recipe_ids) < max(sizes):
+        raise ValueError(f'В базе меньше {max(sizes)} рецептов, сначала '
+                         'выполните generate_dataset.')
+
+    client = get_client(user, host)
+    url = '/api/recipes/download_shopping_cart/'
+    results = OrderedDict()
+    # Корзина пользователя подменяется внутри транзакции, которая
+    # откатывается после замеров, поэтому данные в базе не меняются.
+    with transaction.atomic():
+        for size in sizes:
+            Purchase.objects.filter(user=user).delete()
+            Purchase.objects.bulk_create(
+                Purchase(user=user, recipe_id=recipe_id)
+                for recipe_id in recipe_ids[:size]
+            )
+            results[f'cart_{size}'] = measure(client, url, repeat, warmup)
+        transaction.set_rollback(True)
+    return results
+
+
+def compare_results(results, baseline, tolerance):
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, value in metrics.items():
+            limit = previous[metric] * (1 + tolerance / 100)
+            if metric == 'queries':
+                limit = previous[metric]
+            if value > limit:
+                regressions.append((name, metric, previous[metric], value))
+    return regressions
+
+
+def run_command_subprocess(name, *args, **environment):
+    environment = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE',
+                                              'foodram.settings'),
+        **environment,
+    )
+    process = subprocess.run(
+        [sys.executable, '-m', 'django', name, *args],
+        cwd=settings.BASE_DIR, env=environment, capture_output=True,
+        text=True,
+    )
+    if process.returncode:
+        raise ValueError(process.stderr.strip())
+    return json.loads(process.stdout)
+
+
+def get_load_urls(user, requests):
+    urls = list(get_endpoints(user).values())
+    return [urls[number % len(urls)] for number in range(requests)]
+
+
+def summarize_load(results, elapsed):
+    timings = [timing for timing, status in results]
+    return OrderedDict([
+        ('requests', len(results)),
+        ('errors', sum(status != 200 for timing, status in results)),
+        ('rps', round(len(results) / elapsed, 1)),
+        ('p50_ms', round(percentile(timings, 50), 2)),
+        ('p95_ms', round(percentile(timings, 95), 2)),
+        ('p99_ms', round(percentile(timings, 99), 2)),
+    ])
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+def run_wsgi_load(user, requests, concurrency):
+    authorization = f'Token {get_token_key(user)}'
+    clients = threading.local()
+
+    def fetch(url):
+        if not hasattr(clients, 'client'):
+            clients.client = Client(HTTP_AUTHORIZATION=authorization)
+        started = time.perf_counter()
+        response = clients.client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return (time.perf_counter() - started) * 1000, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, get_load_urls(user, requests)))
+    return summarize_load(results, time.perf_counter() - started)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+def run_asgi_load(user, requests, concurrency):
+    authorization = f'Token {get_token_key(user)}'
+    urls = get_load_urls(user, requests)
+
+    async def fetch(client, semaphore, url):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url, authorization=authorization)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            return ((time.perf_counter() - started) * 1000,
+                    response.status_code)
+
+    async def run():
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(
+            fetch(client, semaphore, url) for url in urls
+        ))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    return summarize_load(results, time.perf_counter() - started)
+
+
+def run_connection_benchmark(user, endpoints, repeat=50, warmup=2):
+    client = get_client(user)
+    urls = get_endpoints(user)
+    results = OrderedDict()
+    for name in endpoints:
+        if name not in urls:
+            continue
+        timings = []
+        connect_timings = []
+        for attempt in range(warmup + repeat):
+            recorder = QueryRecorder()
+            close_old_connections()
+            started = time.perf_counter()
+            with record_queries(recorder):
+                response = client.get(urls[name])
+            elapsed = time.perf_counter() - started
+            close_old_connections()
+            if response.status_code != 200:
+                raise ValueError(
+                    f'{urls[name]} вернул статус {response.status_code}'
+                )
+            if attempt >= warmup:
+                timings.append(elapsed * 1000)
+                connect_timings.append(recorder.connect_duration * 1000)
+        results[name] = OrderedDict([
+            ('p50_ms', round(percentile(timings, 50), 2)),
+            ('p95_ms', round(percentile(timings, 95), 2)),
+            ('connect_ms', round(sum(connect_timings) / repeat, 2)),
+        ])
+    return results
@@ -0,0 +1,137 @@
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Tag
+
+VERSION_KEY = 'recipes:version'
+INGREDIENTS_VERSION_KEY = 'ingredients:version'
+TAG_SLUGS_KEY = 'tags:slugs'
+LOOKUPS_WORKERS_KEY = 'recipes:lookups:workers'
+
+
+def get_recipe_cache():
+    return caches[settings.RECIPE_CACHE_ALIAS]
+
+
+def get_initial_version():
+    return time.time_ns() // 1000
+
+
+def get_version(key=VERSION_KEY):
+    cache = get_recipe_cache()
+    version = cache.get(key)
+    if version is not None:
+        return version
+    version = get_initial_version()
+    cache.add(key, version, None)
+    return cache.get(key, version)
+
+
+def bump_version(key=VERSION_KEY):
+    cache = get_recipe_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, get_initial_version(), None)
+
+
+def get_recipe_key(recipe_id, version, host):
+    return 'recipes:{0}:{1}:{2}'.format(version, host, recipe_id)
+
+
+def get_recipes(recipe_ids, host):
+    cache = get_recipe_cache()
+    version = get_version()
+    keys = {get_recipe_key(recipe_id, version, host): recipe_id
+            for recipe_id in recipe_ids}
+    cached = {keys[key]: data for key, data in cache.get_many(keys).items()}
+    count_lookups(hits=len(cached), misses=len(keys) - len(cached))
+    return cached
+
+
+def set_recipes(representations, host):
+    version = get_version()
+    get_recipe_cache().set_many({
+        get_recipe_key(recipe_id, version, host): data
+        for recipe_id, data in representations.items()
+    })
+
+
+# Счётчики попаданий копятся в памяти процесса и сбрасываются в общий кэш
+# снимком раз в RECIPE_CACHE_STATS_FLUSH_INTERVAL секунд, как в
+# common.metrics: запись на каждый запрос была бы дороже самого кэша.
+class LookupCounter:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.flushed_at = 0
+
+    def get_key(self):
+        return 'recipes:lookups:{0}:{1}'.format(socket.gethostname(),
+                                                os.getpid())
+
+    def record(self, hits, misses):
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+            now = time.monotonic()
+            interval = settings.RECIPE_CACHE_STATS_FLUSH_INTERVAL
+            if now - self.flushed_at < interval:
+                return
+            self.flushed_at = now
+            snapshot = self.get_snapshot()
+        self.flush(snapshot)
+
+    def get_snapshot(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def flush(self, snapshot):
+        cache = get_recipe_cache()
+        key = self.get_key()
+        cache.set(key, snapshot,
+                  settings.RECIPE_CACHE_STATS_FLUSH_INTERVAL * 30)
+        workers = cache.get(LOOKUPS_WORKERS_KEY, set())
+        if key not in workers:
+            cache.set(LOOKUPS_WORKERS_KEY, workers | {key}, None)
+
+
+lookup_counter = LookupCounter()
+
+
+def count_lookups(hits, misses):
+    lookup_counter.record(hits, misses)
+
+
+def get_stats():
+    cache = get_recipe_cache()
+    workers = cache.get(LOOKUPS_WORKERS_KEY, set())
+    snapshots = cache.get_many(workers)
+    with lookup_counter.lock:
+        snapshots[lookup_counter.get_key()] = lookup_counter.get_snapshot()
+    return {
+        'version': get_version(),
+        'hits': sum(snapshot['hits'] for snapshot in snapshots.values()),
+        'misses': sum(snapshot['misses'] for snapshot in snapshots.values()),
+    }
+
+
+def get_tag_ids(slugs):
+    cache = get_recipe_cache()
+    slug_map = cache.get(TAG_SLUGS_KEY)
+    if slug_map is None:
+        slug_map = dict(Tag.objects.filter(
+            slug__isnull=False
+        ).values_list('slug', 'id'))
+        cache.set(TAG_SLUGS_KEY, slug_map, settings.TAG_SLUGS_TIMEOUT)
+    return {slug: slug_map[slug] for slug in slugs if slug in slug_map}
+
+
+def invalidate_tag_slugs():
+    get_recipe_cache().delete(TAG_SLUGS_KEY)
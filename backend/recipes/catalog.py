@@ -0,0 +1,84 @@
+import bisect
+from collections import namedtuple
+
+from .cache import INGREDIENTS_VERSION_KEY, get_version
+from .models import Ingredient
+
+
+# Тот же регистр, что и у lower(name) в индексах и запросах, чтобы каталог
+# и БД находили по одному запросу одни и те же ингредиенты.
+def fold_name(name):
+    return name.lower()
+
+
+CatalogIngredient = namedtuple('CatalogIngredient',
+                               ('id', 'name', 'measurement_unit'))
+
+
+def get_grams(key, size):
+    return {key[start:start + size] for start in range(len(key) - size + 1)}
+
+
+class IngredientCatalog:
+    # Подстроки ищутся по словарю n-грамм длиной до GRAM_SIZE: короткий
+    # запрос сам является n-граммой, для длинного проверяем только строки
+    # из самого короткого списка его n-грамм.
+    GRAM_SIZE = 3
+    _snapshot = (None, (), (), {})
+
+    def load(self, version):
+        rows = sorted(
+            (fold_name(name), CatalogIngredient(pk, name, measurement_unit))
+            for pk, name, measurement_unit in Ingredient.objects.order_by(
+            ).values_list('id', 'name', 'measurement_unit').iterator()
+        )
+        keys = tuple(key for key, _ in rows)
+        ingredients = tuple(ingredient for _, ingredient in rows)
+        grams = {}
+        for position, key in enumerate(keys):
+            for size in range(1, self.GRAM_SIZE + 1):
+                for gram in get_grams(key, size):
+                    grams.setdefault(gram, []).append(position)
+        grams = {gram: tuple(positions) for gram, positions in grams.items()}
+        self._snapshot = (version, keys, ingredients, grams)
+        return self._snapshot
+
+    def get_snapshot(self):
+        version = get_version(INGREDIENTS_VERSION_KEY)
+        snapshot = self._snapshot
+        if snapshot[0] != version:
+            return self.load(version)
+        return snapshot
+
+    def search(self, term, limit):
+        _, keys, ingredients, grams = self.get_snapshot()
+        term = fold_name(term.strip())
+        start = bisect.bisect_left(keys, term)
+        end = bisect.bisect_left(keys, term + '\uffff', lo=start)
+        result = list(ingredients[start:min(end, start + limit)])
+        if len(result) >= limit:
+            return result
+
+        if len(term) <= self.GRAM_SIZE:
+            positions = grams.get(term, ())
+        else:
+            positions = min(
+                (grams.get(gram, ()) for gram in get_grams(
+                    term, self.GRAM_SIZE
+                )),
+                key=len,
+            )
+        for position in positions:
+            key = keys[position]
+            if term in key and not key.startswith(term):
+                result.append(ingredients[position])
+                if len(result) >= limit:
+                    break
+        return result
+
+
+ingredient_catalog = IngredientCatalog()
+
+
+def load_catalog():
+    ingredient_catalog.get_snapshot()
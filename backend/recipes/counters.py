@@ -0,0 +1,58 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Favorite, Purchase, Recipe, Subscription
+
+COUNTERS = (
+    (Favorite, 'recipe', 'favorites_count'),
+    (Purchase, 'recipe', 'purchases_count'),
+    (Recipe, 'author', 'recipes_count'),
+    (Subscription, 'author', 'followers_count'),
+)
+
+
+def get_counted_model(model, field):
+    return model._meta.get_field(field).related_model
+
+
+def change_counters(model, values, delta):
+    for source, field, counter in COUNTERS:
+        if source is not model or field not in values:
+            continue
+        pk = getattr(values[field], 'pk', values[field])
+        get_counted_model(source, field).objects.filter(pk=pk).update(
+            **{counter: Greatest(F(counter) + delta, Value(0))}
+        )
+
+
+def change_instance_counters(instance, delta):
+    model = type(instance)
+    change_counters(model, {
+        field: getattr(instance, model._meta.get_field(field).attname)
+        for source, field, counter in COUNTERS
+        if source is model
+    }, delta)
+
+
+def get_actual_count(source, field):
+    return Coalesce(Subquery(
+        source.objects.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), Value(0))
+
+
+def rebuild_counters(fix=True):
+    drift = {}
+    for source, field, counter in COUNTERS:
+        model = get_counted_model(source, field)
+        actual = get_actual_count(source, field)
+        drifted = model.objects.annotate(actual=actual).exclude(
+            **{counter: F('actual')}
+        ).values('pk')
+        drift[f'{model.__name__}.{counter}'] = drifted.count()
+        if fix:
+            model.objects.filter(pk__in=drifted).update(**{counter: actual})
+    return drift
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
@@ -19,7 +20,8 @@ def get_create_delete_related_response(request, create_delete_model,
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        create_delete_model.objects.create(**model_kwargs)
+        with transaction.atomic():
+            create_delete_model.objects.create(**model_kwargs)
         serializer = serializer(instance, context={'request': request})
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -32,7 +34,8 @@ def get_create_delete_related_response(request, create_delete_model,
                 response_messages.get('not'),
                 status=status.HTTP_400_BAD_REQUEST
             )
-        create_delete_instance.delete()
+        with transaction.atomic():
+            create_delete_instance.delete()
         return Response(
             response_messages.get('deleted'),
             status=status.HTTP_204_NO_CONTENT,
@@ -0,0 +1,159 @@
+import random
+from functools import partial
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .cache import INGREDIENTS_VERSION_KEY, bump_version, invalidate_tag_slugs
+from .counters import rebuild_counters
+from .models import (Favorite, Ingredient, Purchase, Recipe, RecipeIngredient,
+                     Subscription, Tag, User)
+
+MEASUREMENT_UNITS = ('г', 'кг', 'мл', 'л', 'шт.', 'ст. л.', 'ч. л.')
+DEFAULT_PASSWORD = 'benchmark-password'
+IMAGE_NAME = 'recipes/benchmark.jpg'
+
+
+def bulk_create_batches(model, objects, batch_size, ignore_conflicts=False):
+    objects = iter(objects)
+    created = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return created
+        model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        created += len(batch)
+
+
+def sample(rng, population, count):
+    return rng.sample(population, min(count, len(population)))
+
+
+class DatasetGenerator:
+
+    def __init__(self, prefix='bench', batch_size=5000, seed=None):
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.created = {}
+
+    def bulk_create(self, model, objects, ignore_conflicts=False):
+        self.created[model.__name__] = bulk_create_batches(
+            model, objects, self.batch_size, ignore_conflicts
+        )
+
+    def create_users(self, count):
+        password = make_password(DEFAULT_PASSWORD)
+        self.bulk_create(User, (
+            User(
+                email=f'{self.prefix}{number}@example.com',
+                username=f'{self.prefix}{number}',
+                first_name='Нагрузочный',
+                last_name=f'Тест {number}',
+                password=password,
+            )
+            for number in range(count)
+        ))
+        return list(self.get_users().values_list('id', flat=True))
+
+    def get_users(self):
+        return User.objects.filter(
+            username__startswith=self.prefix,
+            email__endswith='@example.com',
+        )
+
+    def create_tags(self, count):
+        self.bulk_create(Tag, (
+            Tag(
+                name=f'{self.prefix} тег {number}',
+                color='#{0:06X}'.format(self.rng.randrange(0x1000000)),
+                slug=f'{self.prefix}-{number}',
+            )
+            for number in range(count)
+        ), ignore_conflicts=True)
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def create_ingredients(self, count):
+        self.bulk_create(Ingredient, (
+            Ingredient(
+                name=f'{self.prefix} ингредиент {number}',
+                measurement_unit=self.rng.choice(MEASUREMENT_UNITS),
+            )
+            for number in range(count)
+        ))
+        return list(Ingredient.objects.values_list('id', flat=True))
+
+    def create_recipes(self, count, user_ids):
+        self.bulk_create(Recipe, (
+            Recipe(
+                author_id=self.rng.choice(user_ids),
+                name=f'{self.prefix} рецепт {number}',
+                image=IMAGE_NAME,
+                text='Сгенерировано для нагрузочного тестирования.',
+                cooking_time=self.rng.randint(1, 180),
+            )
+            for number in range(count)
+        ))
+        return list(Recipe.objects.filter(
+            name__startswith=f'{self.prefix} рецепт '
+        ).values_list('id', flat=True))
+
+    def create_recipe_tags(self, recipe_ids, tag_ids, per_recipe):
+        self.bulk_create(Recipe.tags.through, (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in sample(self.rng, tag_ids,
+                                 self.rng.randint(1, per_recipe))
+        ))
+
+    def create_recipe_ingredients(self, recipe_ids, ingredient_ids,
+                                  per_recipe):
+        self.bulk_create(RecipeIngredient, (
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=self.rng.randint(1, 1000),
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in sample(self.rng, ingredient_ids, per_recipe)
+        ))
+
+    def create_user_recipes(self, model, user_ids, recipe_ids, per_user):
+        self.bulk_create(model, (
+            model(user_id=user_id, recipe_id=recipe_id)
+            for user_id in user_ids
+            for recipe_id in sample(self.rng, recipe_ids, per_user)
+        ))
+
+    def create_subscriptions(self, user_ids, per_user):
+        self.bulk_create(Subscription, (
+            Subscription(user_id=user_id, author_id=author_id)
+            for user_id in user_ids
+            for author_id in [
+                author_id
+                for author_id in sample(self.rng, user_ids, per_user + 1)
+                if author_id != user_id
+            ][:per_user]
+        ))
+
+    @transaction.atomic
+    def generate(self, users, recipes, tags, ingredients,
+                 ingredients_per_recipe, tags_per_recipe, favorites, carts,
+                 subscriptions):
+        user_ids = self.create_users(users)
+        tag_ids = self.create_tags(tags)
+        ingredient_ids = self.create_ingredients(ingredients)
+        recipe_ids = self.create_recipes(recipes, user_ids)
+        self.create_recipe_tags(recipe_ids, tag_ids, tags_per_recipe)
+        self.create_recipe_ingredients(recipe_ids, ingredient_ids,
+                                       ingredients_per_recipe)
+        self.create_user_recipes(Favorite, user_ids, recipe_ids, favorites)
+        self.create_user_recipes(Purchase, user_ids, recipe_ids, carts)
+        self.create_subscriptions(user_ids, subscriptions)
+
+        rebuild_counters(fix=True)
+        transaction.on_commit(bump_version)
+        transaction.on_commit(invalidate_tag_slugs)
+        transaction.on_commit(partial(bump_version, INGREDIENTS_VERSION_KEY))
+        return self.created
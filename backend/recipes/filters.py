@@ -1,35 +1,151 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Lower
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from rest_framework.settings import api_settings
 
-from .models import Recipe
+from .cache import get_tag_ids
+from .catalog import fold_name
+from .models import Favorite, Purchase, Recipe
 
 
 class CustomFilter(filters.FilterSet):
     author = filters.filters.CharFilter()
-    tags = filters.filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = filters.filters.CharFilter(method='recipe_tags')
     is_favorited = filters.filters.BooleanFilter(method='recipe_is_favorited')
     is_in_shopping_cart = filters.filters.BooleanFilter(
         method='recipe_is_in_shopping_cart'
     )
 
+    tags_match_param = 'tags_match'
+
     class Meta:
         model = Recipe
         fields = ('is_favorited', 'is_in_shopping_cart', 'author', 'tags')
 
-    def recipe_is_favorited(self, queryset, name, value):
-        user = self.request.user
-        if value:
-            return Recipe.objects.filter(favorited__user=user)
+    def recipe_tags(self, queryset, name, value):
+        slugs = self.data.getlist(name)
+        tag_ids = get_tag_ids(slugs)
+        match_all = self.data.get(self.tags_match_param) == 'all'
+        if not tag_ids or (match_all and len(tag_ids) < len(set(slugs))):
+            return queryset.none()
+
+        recipe_tags = Recipe.tags.through.objects.filter(
+            recipe_id=OuterRef('pk')
+        )
+        if not match_all:
+            return queryset.filter(
+                Exists(recipe_tags.filter(tag_id__in=tag_ids.values()))
+            )
+        for tag_id in tag_ids.values():
+            queryset = queryset.filter(
+                Exists(recipe_tags.filter(tag_id=tag_id))
+            )
         return queryset
 
+    def recipe_is_favorited(self, queryset, name, value):
+        return self.filter_user_relation(queryset, Favorite, value)
+
     def recipe_is_in_shopping_cart(self, queryset, name, value):
+        return self.filter_user_relation(queryset, Purchase, value)
+
+    def filter_user_relation(self, queryset, model, value):
         user = self.request.user
-        if value:
-            return Recipe.objects.filter(in_purchase_list__user=user)
-        return queryset
+        if not value:
+            return queryset
+        if not user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(Exists(model.objects.filter(
+            user=user, recipe_id=OuterRef('pk')
+        )))
 
 
-def purchase_recipe_limit_filter(request, queryset):
+class RecipeOrderingFilter(OrderingFilter):
+    tiebreaker = ('-pub_date', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return (*ordering, *(field for field in self.tiebreaker
+                             if field.lstrip('-') not in ordering
+                             and field not in ordering))
+
+
+class IngredientSearchFilter(BaseFilterBackend):
+    search_param = api_settings.SEARCH_PARAM
+    fuzzy_param = 'fuzzy'
+    result_limit = 50
+
+    @classmethod
+    def get_search_term(cls, request):
+        search = request.query_params.get(cls.search_param, '')
+        return fold_name(search.strip())
+
+    def filter_queryset(self, request, queryset, view):
+        search = self.get_search_term(request)
+        if not search:
+            return queryset
+        return queryset.annotate(name_lower=Lower('name')).filter(
+            name_lower__startswith=search
+        )
+
+    def search(self, queryset, term, fuzzy=False):
+        # Префиксы ищутся по индексу lower(name) text_pattern_ops, и только
+        # если их не хватило до лимита, отдельными запросами добираются
+        # подстроки и, в нечётком режиме, похожие по триграммам названия.
+        queryset = queryset.annotate(name_lower=Lower('name'))
+        found = list(queryset.filter(name_lower__startswith=term).order_by(
+            'name_lower', 'pk'
+        )[:self.result_limit])
+        if len(found) < self.result_limit:
+            found.extend(queryset.filter(name_lower__contains=term).exclude(
+                name_lower__startswith=term
+            ).order_by('name_lower', 'pk')[:self.result_limit - len(found)])
+        if (fuzzy and len(found) < self.result_limit
+                and connections[queryset.db].vendor == 'postgresql'):
+            found.extend(queryset.filter(
+                name_lower__trigram_similar=term
+            ).exclude(name_lower__contains=term).annotate(
+                similarity=TrigramSimilarity('name_lower', term)
+            ).order_by('-similarity', 'name_lower', 'pk')[
+                :self.result_limit - len(found)
+            ])
+        return found
+
+
+def get_recipes_limit(request):
     recipes_limit = request.query_params.get('recipes_limit')
-    if recipes_limit:
-        return queryset[:int(recipes_limit)]
+    if not recipes_limit:
+        return None
+    try:
+        recipes_limit = int(recipes_limit)
+    except ValueError:
+        recipes_limit = -1
+    if recipes_limit < 0:
+        raise ValidationError({
+            'recipes_limit': 'Укажите целое неотрицательное число.'
+        })
+    return recipes_limit
+
+
+def purchase_recipe_limit_filter(request, queryset):
+    recipes_limit = get_recipes_limit(request)
+    if recipes_limit is not None:
+        return queryset[:recipes_limit]
     return queryset
+
+
+def recipes_limit_prefetch(request):
+    recipes = Recipe.objects.all()
+    recipes_limit = get_recipes_limit(request)
+    if recipes_limit is not None:
+        recipes = recipes.filter(id__in=Subquery(
+            Recipe.objects.filter(
+                author=OuterRef('author')
+            ).values('id')[:recipes_limit]
+        ))
+    return Prefetch('recipes', queryset=recipes, to_attr='limited_recipes')
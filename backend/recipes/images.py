@@ -0,0 +1,122 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from .cache import bump_version
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIZES = {
+    'thumbnail': (320, 320),
+    'medium': (960, 960),
+}
+
+IMAGE_FORMATS = {'jpeg': 'JPEG'}
+for extension, image_format in (('webp', 'WEBP'), ('avif', 'AVIF')):
+    if extension in features.modules and features.check_module(extension):
+        IMAGE_FORMATS[extension] = image_format
+
+VARIANTS_DIR = 'variants'
+
+
+def get_variant_name(name, size, extension):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return os.path.join(VARIANTS_DIR, f'{stem}_{size}.{extension}')
+
+
+def get_variant_urls(variants, request=None):
+    urls = {}
+    for size, names in (variants or {}).items():
+        for extension, variant_name in names.items():
+            url = default_storage.url(variant_name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls.setdefault(size, {})[extension] = url
+    return urls
+
+
+def iter_variant_names(variants):
+    for names in (variants or {}).values():
+        yield from names.values()
+
+
+def delete_variants(variants):
+    for variant_name in iter_variant_names(variants):
+        default_storage.delete(variant_name)
+
+
+def process_image(name):
+    with default_storage.open(name) as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image = image.convert('RGB')
+
+    variants = {}
+    for size, dimensions in IMAGE_SIZES.items():
+        variant = image.copy()
+        variant.thumbnail(dimensions)
+        for extension, image_format in IMAGE_FORMATS.items():
+            buffer = io.BytesIO()
+            variant.save(buffer, image_format, quality=80)
+            variant_name = get_variant_name(name, size, extension)
+            if default_storage.exists(variant_name):
+                default_storage.delete(variant_name)
+            variants.setdefault(size, {})[extension] = default_storage.save(
+                variant_name, ContentFile(buffer.getvalue())
+            )
+    return variants
+
+
+def save_variants(name, variants):
+    recipes = Recipe.objects.filter(image=name)
+    previous = list(recipes.values_list('image_variants', flat=True))
+    if not recipes.update(image_variants=variants):
+        delete_variants(variants)
+        return
+    current = set(iter_variant_names(variants))
+    for stale in previous:
+        delete_variants({
+            size: {extension: variant_name
+                   for extension, variant_name in names.items()
+                   if variant_name not in current}
+            for size, names in (stale or {}).items()
+        })
+    bump_version()
+
+
+def run_image_processing(name):
+    try:
+        save_variants(name, process_image(name))
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+
+
+def run_variant_removal(variants):
+    try:
+        delete_variants(variants)
+    except Exception:
+        logger.exception('Не удалось удалить варианты изображения %s',
+                         variants)
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.IMAGE_PIPELINE_WORKERS,
+        thread_name_prefix='image-pipeline',
+    )
+
+
+def schedule_image_processing(name):
+    return get_executor().submit(run_image_processing, name)
+
+
+def schedule_variant_removal(variants):
+    return get_executor().submit(run_variant_removal, variants)
@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+from functools import partial
+from itertools import islice
+
+from django.db import connections, transaction
+
+from .cache import INGREDIENTS_VERSION_KEY, bump_version
+from .dataset import bulk_create_batches
+from .models import Ingredient
+
+NAME_MAX_LENGTH = Ingredient._meta.get_field('name').max_length
+UNIT_MAX_LENGTH = Ingredient._meta.get_field('measurement_unit').max_length
+
+STAGING_TABLE = 'recipes_ingredient_import'
+
+
+def iter_json_array(stream, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    opened = False
+    for chunk in iter(partial(stream.read, chunk_size), ''):
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                break
+            if not opened:
+                if buffer[position] != '[':
+                    raise ValueError('Ожидается JSON-массив.')
+                opened = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                break
+            yield record
+    raise ValueError('Неожиданный конец JSON-файла.')
+
+
+def read_csv(stream):
+    for row in csv.reader(stream):
+        if row:
+            yield row[0], row[1] if len(row) > 1 else ''
+
+
+def read_json(stream):
+    for record in iter_json_array(stream):
+        fields = record.get('fields', record)
+        yield (fields.get('name', fields.get('title')),
+               fields.get('measurement_unit', fields.get('dimension')))
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+def normalize(value):
+    return ' '.join(str(value or '').split())
+
+
+class IngredientImport:
+
+    def __init__(self, batch_size=50000, using='default'):
+        self.batch_size = batch_size
+        self.using = using
+        self.read = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.inserted = 0
+
+    def clean(self, rows):
+        seen = set()
+        for name, measurement_unit in rows:
+            self.read += 1
+            key = (normalize(name).lower(), normalize(measurement_unit))
+            if (not all(key) or len(key[0]) > NAME_MAX_LENGTH
+                    or len(key[1]) > UNIT_MAX_LENGTH):
+                self.skipped += 1
+            elif key in seen:
+                self.duplicates += 1
+            else:
+                seen.add(key)
+                yield key
+
+    @transaction.atomic
+    def run(self, rows):
+        rows = self.clean(rows)
+        if connections[self.using].vendor == 'postgresql':
+            self.copy(rows)
+        else:
+            self.bulk_create(rows)
+        transaction.on_commit(partial(bump_version, INGREDIENTS_VERSION_KEY))
+        return self.inserted
+
+    def bulk_create(self, rows):
+        before = Ingredient.objects.using(self.using).count()
+        bulk_create_batches(Ingredient, (
+            Ingredient(name=name, measurement_unit=measurement_unit)
+            for name, measurement_unit in rows
+        ), self.batch_size, ignore_conflicts=True)
+        self.inserted = (Ingredient.objects.using(self.using).count()
+                         - before)
+
+    def copy(self, rows):
+        table = Ingredient._meta.db_table
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {STAGING_TABLE} '
+                f'(name varchar({NAME_MAX_LENGTH}), '
+                f'measurement_unit varchar({UNIT_MAX_LENGTH})) '
+                'ON COMMIT DROP'
+            )
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f'COPY {STAGING_TABLE} (name, measurement_unit) '
+                    'FROM STDIN WITH (FORMAT csv)',
+                    buffer,
+                )
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                f'SELECT name, measurement_unit FROM {STAGING_TABLE} '
+                'ON CONFLICT (name, measurement_unit) DO NOTHING'
+            )
+            self.inserted = cursor.rowcount
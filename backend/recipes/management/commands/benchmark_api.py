@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.benchmark import (compare_results, get_benchmark_user,
+                               run_benchmark)
+from recipes.models import User
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку (p50/p95) и число запросов к БД '
+            'для основных эндпоинтов API')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Количество замеров на эндпоинт')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Количество прогревочных запросов')
+        parser.add_argument('--user',
+                            help='Email пользователя, от имени которого '
+                                 'выполняются запросы')
+        parser.add_argument('--host',
+                            help='Значение заголовка Host для запросов')
+        parser.add_argument('--endpoint', action='append',
+                            help='Замерить только указанный эндпоинт')
+        parser.add_argument('--output',
+                            help='Сохранить результаты в JSON-файл')
+        parser.add_argument('--baseline',
+                            help='JSON-файл предыдущего прогона '
+                                 'для сравнения')
+        parser.add_argument('--tolerance', type=float, default=20,
+                            help='Допустимый рост задержки в процентах '
+                                 'относительно --baseline')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_benchmark_user(options['user'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        if user is None:
+            raise CommandError('В базе нет пользователей, сначала '
+                               'выполните generate_dataset.')
+
+        try:
+            results = run_benchmark(
+                user,
+                repeat=options['repeat'],
+                warmup=options['warmup'],
+                host=options['host'],
+                only=options['endpoint'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.write_results(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        if options['baseline']:
+            self.check_baseline(results, options['baseline'],
+                                options['tolerance'])
+
+    def write_results(self, results):
+        self.stdout.write(f'{"endpoint":<28}{"p50, мс":>10}{"p95, мс":>10}'
+                          f'{"запросов":>10}')
+        for name, metrics in results.items():
+            self.stdout.write(f'{name:<28}{metrics["p50_ms"]:>10}'
+                              f'{metrics["p95_ms"]:>10}'
+                              f'{metrics["queries"]:>10}')
+
+    def check_baseline(self, results, path, tolerance):
+        with open(path) as baseline:
+            regressions = compare_results(results, json.load(baseline),
+                                          tolerance)
+        for name, metric, before, after in regressions:
+            self.stderr.write(f'{name}: {metric} {before} -> {after}')
+        if regressions:
+            raise CommandError('Обнаружены регрессии производительности.')
+        self.stdout.write(self.style.SUCCESS('Регрессий не обнаружено.'))
@@ -0,0 +1,82 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.benchmark import (get_benchmark_user, run_command_subprocess,
+                               run_connection_benchmark)
+
+CONFIGURATIONS = {
+    'new': {
+        'DB_CONN_MAX_AGE': '0',
+        'DB_CONN_HEALTH_CHECKS': 'false',
+        'DB_POOL': 'false',
+    },
+    'persistent': {
+        'DB_CONN_MAX_AGE': '60',
+        'DB_CONN_HEALTH_CHECKS': 'true',
+        'DB_POOL': 'false',
+    },
+    'pool': {
+        'DB_CONN_MAX_AGE': '0',
+        'DB_CONN_HEALTH_CHECKS': 'true',
+        'DB_POOL': 'true',
+    },
+}
+
+ENDPOINTS = ('tag_list', 'ingredient_search_fuzzy')
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает задержки с новыми, постоянными и пулированными '
+            'соединениями с БД')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--configuration', choices=sorted(CONFIGURATIONS),
+                            help='Замерить только текущую конфигурацию')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Количество замеров на эндпоинт')
+        parser.add_argument('--user',
+                            help='Email пользователя, от имени которого '
+                                 'выполняются запросы')
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести результаты в формате JSON')
+
+    def handle(self, *args, **options):
+        try:
+            if options['configuration']:
+                results = {options['configuration']: self.run(options)}
+            else:
+                results = {
+                    name: self.run_subprocess(name, environment, options)
+                    for name, environment in CONFIGURATIONS.items()
+                }
+        except ValueError as error:
+            raise CommandError(error)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+            return
+        self.stdout.write(f'{"configuration":<14}{"endpoint":<25}'
+                          f'{"p50, мс":>10}{"p95, мс":>10}'
+                          f'{"connect, мс":>14}')
+        for name, endpoints in results.items():
+            for endpoint, metrics in endpoints.items():
+                self.stdout.write(f'{name:<14}{endpoint:<25}'
+                                  f'{metrics["p50_ms"]:>10}'
+                                  f'{metrics["p95_ms"]:>10}'
+                                  f'{metrics["connect_ms"]:>14}')
+
+    def run(self, options):
+        user = get_benchmark_user(options['user'])
+        if user is None:
+            raise CommandError('В базе нет пользователей, сначала '
+                               'выполните generate_dataset.')
+        return run_connection_benchmark(user, ENDPOINTS,
+                                        repeat=options['repeat'])
+
+    def run_subprocess(self, name, environment, options):
+        args = ['--json', '--configuration', name,
+                '--repeat', str(options['repeat'])]
+        if options['user']:
+            args += ['--user', options['user']]
+        return run_command_subprocess('benchmark_connections', *args,
+                                      **environment)[name]
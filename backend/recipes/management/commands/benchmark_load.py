@@ -0,0 +1,79 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from recipes.benchmark import (get_benchmark_user, run_asgi_load,
+                               run_command_subprocess, run_wsgi_load)
+
+LOAD_RUNNERS = {
+    'wsgi': run_wsgi_load,
+    'asgi': run_asgi_load,
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность и задержки WSGI и ASGI '
+            'под конкурентной смешанной нагрузкой')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=('wsgi', 'asgi', 'both'),
+                            default='both',
+                            help='Режим сервера для замера')
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Общее количество запросов')
+        parser.add_argument('--concurrency', type=int, default=20,
+                            help='Количество одновременных запросов')
+        parser.add_argument('--user',
+                            help='Email пользователя, от имени которого '
+                                 'выполняются запросы')
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести результаты в формате JSON')
+
+    def handle(self, *args, **options):
+        if options['mode'] == 'both':
+            results = {mode: self.run_subprocess(mode, options)
+                       for mode in LOAD_RUNNERS}
+        else:
+            results = {options['mode']: self.run_mode(options)}
+
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+            return
+        columns = ('requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms')
+        self.stdout.write(f'{"mode":<8}' + ''.join(
+            f'{column:>10}' for column in columns
+        ))
+        for mode, metrics in results.items():
+            self.stdout.write(f'{mode:<8}' + ''.join(
+                f'{metrics[column]:>10}' for column in columns
+            ))
+
+    def run_mode(self, options):
+        mode = options['mode']
+        if settings.ASYNC_VIEWS != (mode == 'asgi'):
+            raise CommandError(
+                f'Для режима {mode} установите DJANGO_ASYNC_VIEWS='
+                f'{str(mode == "asgi").lower()}.'
+            )
+        user = get_benchmark_user(options['user'])
+        if user is None:
+            raise CommandError('В базе нет пользователей, сначала '
+                               'выполните generate_dataset.')
+        return LOAD_RUNNERS[mode](user, options['requests'],
+                                  options['concurrency'])
+
+    def run_subprocess(self, mode, options):
+        args = [
+            '--json', '--mode', mode,
+            '--requests', str(options['requests']),
+            '--concurrency', str(options['concurrency']),
+        ]
+        if options['user']:
+            args += ['--user', options['user']]
+        try:
+            return run_command_subprocess(
+                'benchmark_load', *args,
+                DJANGO_ASYNC_VIEWS=str(mode == 'asgi').lower(),
+            )[mode]
+        except ValueError as error:
+            raise CommandError(error)
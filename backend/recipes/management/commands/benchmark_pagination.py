@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.benchmark import get_benchmark_user, run_pagination_benchmark
+from recipes.models import User
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает задержку первой и глубокой страницы ленты рецептов '
+            'при постраничной и курсорной пагинации')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', type=int, default=10000,
+                            help='Номер глубокой страницы')
+        parser.add_argument('--limit', type=int, default=100,
+                            help='Размер страницы')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Количество замеров на эндпоинт')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Количество прогревочных запросов')
+        parser.add_argument('--user',
+                            help='Email пользователя, от имени которого '
+                                 'выполняются запросы')
+        parser.add_argument('--host',
+                            help='Значение заголовка Host для запросов')
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести результаты в формате JSON')
+
+    def handle(self, *args, **options):
+        if options['page'] < 1 or options['limit'] < 1:
+            raise CommandError('--page и --limit должны быть больше нуля.')
+        try:
+            user = get_benchmark_user(options['user'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        if user is None:
+            raise CommandError('В базе нет пользователей, сначала '
+                               'выполните generate_dataset.')
+
+        try:
+            results = run_pagination_benchmark(
+                user,
+                page=options['page'],
+                limit=options['limit'],
+                repeat=options['repeat'],
+                warmup=options['warmup'],
+                host=options['host'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+            return
+        self.stdout.write(f'{"mode":<16}{"p50, мс":>10}{"p95, мс":>10}'
+                          f'{"запросов":>10}')
+        for name, metrics in results.items():
+            self.stdout.write(f'{name:<16}{metrics["p50_ms"]:>10}'
+                              f'{metrics["p95_ms"]:>10}'
+                              f'{metrics["queries"]:>10}')
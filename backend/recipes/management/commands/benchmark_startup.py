@@ -0,0 +1,51 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+METRICS = ('process_ms', 'import_ms', 'warm_up_ms', 'first_request_ms',
+           'second_request_ms')
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время импорта приложения и первого запроса '
+            'с прогревом и без него')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Количество запусков для каждого варианта')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"":<10}' + ''.join(
+            f'{metric:>19}' for metric in METRICS
+        ))
+        for variant, flags in (('cold', ['--no-warm']), ('warm', [])):
+            runs = [self.run_once(flags) for run in range(options['runs'])]
+            self.stdout.write(f'{variant:<10}' + ''.join(
+                f'{statistics.median(run[metric] for run in runs):>19.1f}'
+                for metric in METRICS
+            ))
+
+    def run_once(self, flags):
+        environment = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE',
+                                                  'foodram.settings'),
+        )
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-m', 'common.startup', *flags],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True,
+            text=True,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        if process.returncode:
+            raise CommandError(process.stderr.strip())
+        timings = json.loads(process.stdout.splitlines()[-1])
+        timings['process_ms'] = elapsed
+        return timings
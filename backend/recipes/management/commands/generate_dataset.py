@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.dataset import DEFAULT_PASSWORD, DatasetGenerator
+
+COUNT_OPTIONS = (
+    ('users', 1000, 'Количество пользователей'),
+    ('recipes', 10000, 'Количество рецептов'),
+    ('tags', 10, 'Количество тегов'),
+    ('ingredients', 2000, 'Количество ингредиентов'),
+    ('ingredients_per_recipe', 8, 'Ингредиентов в рецепте'),
+    ('tags_per_recipe', 3, 'Максимум тегов у рецепта'),
+    ('favorites', 20, 'Рецептов в избранном у пользователя'),
+    ('carts', 5, 'Рецептов в списке покупок у пользователя'),
+    ('subscriptions', 10, 'Подписок у пользователя'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Генерирует синтетические данные для нагрузочного тестирования'
+
+    def add_arguments(self, parser):
+        for name, default, help_text in COUNT_OPTIONS:
+            parser.add_argument(
+                '--' + name.replace('_', '-'),
+                type=int,
+                default=default,
+                help=f'{help_text} (по умолчанию {default})',
+            )
+        parser.add_argument(
+            '--prefix',
+            default='bench',
+            help='Префикс имён сгенерированных объектов',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Размер пачки для bulk_create',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Начальное значение генератора случайных чисел',
+        )
+
+    def handle(self, *args, **options):
+        generator = DatasetGenerator(
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+        )
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        if generator.get_users().exists():
+            raise CommandError(
+                f'Данные с префиксом {options["prefix"]} уже существуют.'
+            )
+
+        started = time.perf_counter()
+        created = generator.generate(**{
+            name: options[name] for name, default, help_text in COUNT_OPTIONS
+        })
+        elapsed = time.perf_counter() - started
+
+        for model, count in created.items():
+            self.stdout.write(f'{model}: {count}')
+        total = sum(created.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {total} строк за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с). '
+            f'Пароль пользователей: {DEFAULT_PASSWORD}.'
+        ))
@@ -0,0 +1,52 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.imports import READERS, IngredientImport
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV или JSON без дубликатов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к CSV- или JSON-файлу')
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Формат файла, по умолчанию определяется по расширению',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50000,
+            help='Количество строк в одной пачке',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = (options['format']
+                       or os.path.splitext(path)[1].lstrip('.').lower())
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {path}')
+
+        ingredient_import = IngredientImport(
+            batch_size=options['batch_size']
+        )
+        started = time.perf_counter()
+        try:
+            with open(path, encoding='utf-8', newline='') as stream:
+                ingredient_import.run(READERS[file_format](stream))
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'Прочитано: {ingredient_import.read}, '
+            f'повторов: {ingredient_import.duplicates}, '
+            f'пропущено: {ingredient_import.skipped}'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено {ingredient_import.inserted} ингредиентов '
+            f'за {elapsed:.1f} с '
+            f'({ingredient_import.read / max(elapsed, 1e-6):.0f} строк/с).'
+        ))
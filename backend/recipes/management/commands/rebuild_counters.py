@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from recipes.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики избранного, покупок, рецептов и подписчиков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не исправляя их',
+        )
+
+    def handle(self, *args, **options):
+        check = options['check']
+        with transaction.atomic():
+            drift = rebuild_counters(fix=not check)
+
+        for counter, drifted in drift.items():
+            self.stdout.write(f'{counter}: расхождений {drifted}')
+        if check and any(drift.values()):
+            raise CommandError('Счётчики расходятся с данными.')
+        if not check:
+            self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
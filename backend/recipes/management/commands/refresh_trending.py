@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from recipes.trending import refresh_rankings
+
+
+class Command(BaseCommand):
+    help = 'Обновляет рейтинг популярных рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать рейтинг заново, а не инкрементально',
+        )
+
+    def handle(self, *args, **options):
+        updated = refresh_rankings(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг обновлён, рецептов с новыми событиями: {updated}.'
+        ))
@@ -0,0 +1,40 @@
+import json
+
+from common.metrics import get_summary, reset_summary
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Выводит сводку по задержкам и запросам к БД для каждого view'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Вывести сводку в формате JSON',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Очистить сводку после вывода',
+        )
+
+    def handle(self, *args, **options):
+        summary = get_summary()
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            self.write_table(summary)
+        if options['reset']:
+            reset_summary()
+
+    def write_table(self, summary):
+        columns = ('requests', 'over_budget', 'p50_ms', 'p95_ms', 'db_ms',
+                   'connect_ms', 'queries', 'max_queries')
+        self.stdout.write(f'{"view":<40}' + ''.join(
+            f'{column:>12}' for column in columns
+        ))
+        for view, stats in summary.items():
+            self.stdout.write(f'{view:<40}' + ''.join(
+                f'{stats[column]:>12}' for column in columns
+            ))
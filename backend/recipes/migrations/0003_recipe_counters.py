@@ -0,0 +1,47 @@
+# Generated by Django 3.2.5 on 2026-10-18 18:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+COUNTERS = (
+    ('Favorite', 'recipe', 'favorites_count'),
+    ('Purchase', 'recipe', 'purchases_count'),
+    ('Recipe', 'author', 'recipes_count'),
+    ('Subscription', 'author', 'followers_count'),
+)
+
+
+def fill_counters(apps, schema_editor):
+    for source_name, field, counter in COUNTERS:
+        source = apps.get_model('recipes', source_name)
+        model = source._meta.get_field(field).related_model
+        model.objects.update(**{counter: Coalesce(Subquery(
+            source.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total')
+        ), Value(0))})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_ingredient_search_indexes'),
+        ('users', '0003_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='purchases_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В списках покупок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
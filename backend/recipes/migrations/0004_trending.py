@@ -0,0 +1,63 @@
+# Generated by Django 3.2.5 on 2026-10-18 18:02
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# Значение для существующих строк до заполнения датой публикации рецепта.
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def fill_created(apps, schema_editor):
+    # Настоящая дата добавления неизвестна, а по умолчанию AddField записал
+    # бы текущее время, и первый refresh_trending --full счёл бы все
+    # старые добавления свежими. Дата публикации рецепта — нижняя граница
+    # для любого добавления в избранное или в покупки.
+    Recipe = apps.get_model('recipes', 'Recipe')
+    pub_date = Recipe.objects.filter(
+        pk=OuterRef('recipe_id')
+    ).values('pub_date')[:1]
+    for model_name in ('Favorite', 'Purchase'):
+        model = apps.get_model('recipes', model_name)
+        model.objects.update(created=Subquery(pub_date))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeRanking',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='recipes.recipe', verbose_name='Рецепт')),
+                ('score', models.FloatField(default=0, verbose_name='Популярность')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Дата пересчёта')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг рецепта',
+                'verbose_name_plural': 'Рейтинги рецептов',
+            },
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=EPOCH, verbose_name='Дата добавления'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=EPOCH, verbose_name='Дата добавления'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_created, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reciperanking',
+            index=models.Index(fields=['-score'], name='recipes_ranking_score_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.5 on 2026-10-18 18:08
+
+from django.db import migrations
+from django.db.models import Count, F, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    duplicates = Ingredient.objects.values(
+        'name', 'measurement_unit'
+    ).order_by().annotate(kept=Min('id'), total=Count('id')).filter(total__gt=1)
+    for duplicate in duplicates:
+        kept = duplicate.pop('kept')
+        duplicate.pop('total')
+        merged = Ingredient.objects.filter(**duplicate).exclude(id=kept)
+        for ingredient_id in merged.values_list('id', flat=True):
+            lines = RecipeIngredient.objects.filter(ingredient_id=ingredient_id)
+            kept_recipes = RecipeIngredient.objects.filter(
+                ingredient_id=kept
+            ).values('recipe')
+            for recipe_id, amount in lines.filter(
+                recipe__in=kept_recipes
+            ).values_list('recipe_id', 'amount'):
+                RecipeIngredient.objects.filter(
+                    recipe_id=recipe_id, ingredient_id=kept
+                ).update(amount=F('amount') + amount)
+            lines.exclude(recipe__in=kept_recipes).update(ingredient_id=kept)
+        merged.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='ingredient',
+            unique_together={('name', 'measurement_unit')},
+        ),
+    ]
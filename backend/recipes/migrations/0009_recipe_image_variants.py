@@ -0,0 +1,48 @@
+# Generated by Django 3.2.5 on 2026-10-18 18:37
+
+import os
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+VARIANT_SIZES = ('thumbnail', 'medium')
+VARIANT_EXTENSIONS = ('jpeg', 'webp', 'avif')
+
+
+def find_variants(name):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    variants = {}
+    for size in VARIANT_SIZES:
+        for extension in VARIANT_EXTENSIONS:
+            variant_name = os.path.join('variants',
+                                        f'{stem}_{size}.{extension}')
+            if default_storage.exists(variant_name):
+                variants.setdefault(size, {})[extension] = variant_name
+    return variants
+
+
+def fill_image_variants(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    names = Recipe.objects.exclude(image='').order_by().values_list(
+        'image', flat=True
+    ).distinct()
+    for name in list(names):
+        variants = find_variants(name)
+        if variants:
+            Recipe.objects.filter(image=name).update(image_variants=variants)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_ingredient_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Варианты изображения'),
+        ),
+        migrations.RunPython(fill_image_variants, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
+import hashlib
+
 from colorfield.fields import ColorField
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
+from django.db.models import (BooleanField, Exists, OuterRef, Prefetch, Sum,
+                              Value)
 
 User = get_user_model()
 
@@ -61,6 +65,31 @@ class Ingredient(models.Model):
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
         ordering = ('name',)
+        unique_together = ('name', 'measurement_unit')
+
+
+class RecipeQuerySet(models.QuerySet):
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.select_related('author').annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField()),
+            )
+
+        authors = User.objects.annotate(is_subscribed=Exists(
+            Subscription.objects.filter(user=user, author=OuterRef('pk'))
+        ))
+        return self.prefetch_related(
+            Prefetch('author', queryset=authors)
+        ).annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            is_in_shopping_cart=Exists(Purchase.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+        )
 
 
 class Recipe(models.Model):
@@ -80,6 +109,12 @@ class Recipe(models.Model):
         verbose_name='Картинка',
         help_text='Выберите изображение',
     )
+    image_variants = models.JSONField(
+        verbose_name='Варианты изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     text = models.TextField(
         verbose_name='Описание',
         help_text='Опишите рецепт',
@@ -102,6 +137,18 @@ class Recipe(models.Model):
     )
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации')
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='В избранном',
+        default=0,
+        editable=False,
+    )
+    purchases_count = models.PositiveIntegerField(
+        verbose_name='В списках покупок',
+        default=0,
+        editable=False,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -109,7 +156,13 @@ class Recipe(models.Model):
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='recipes_recipe_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='recipes_recipe_author_idx'),
+        ]
 
 
 class RecipeIngredient(models.Model):
@@ -134,7 +187,7 @@ class RecipeIngredient(models.Model):
         unique_together = ('recipe', 'ingredient')
         verbose_name = 'Рецепт-ингредиент'
         verbose_name_plural = 'Рецепты-ингредиенты'
-        ordering = ('recipe__name',)
+        ordering = ('id',)
 
 
 class Subscription(models.Model):
@@ -158,7 +211,10 @@ class Subscription(models.Model):
         unique_together = ('author', 'user')
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
-        unique_together = ('author', 'user')
+        indexes = [
+            models.Index(fields=['user', 'author'],
+                         name='recipes_subscription_user_idx'),
+        ]
 
 
 class Favorite(models.Model):
@@ -174,6 +230,11 @@ class Favorite(models.Model):
         related_name='favorited',
         on_delete=models.CASCADE,
     )
+    created = models.DateTimeField(
+        verbose_name='Дата добавления',
+        auto_now_add=True,
+        db_index=True,
+    )
 
     def __str__(self):
         return f'{self.recipe.name} в избранном у пользователя {self.user}'
@@ -181,8 +242,12 @@ class Favorite(models.Model):
     class Meta:
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранное'
-        ordering = ('recipe__name',)
+        ordering = ('-id',)
         unique_together = ('recipe', 'user')
+        indexes = [
+            models.Index(fields=['user', 'recipe'],
+                         name='recipes_favorite_user_idx'),
+        ]
 
 
 class Purchase(models.Model):
@@ -198,6 +263,11 @@ class Purchase(models.Model):
         related_name='in_purchase_list',
         on_delete=models.CASCADE,
     )
+    created = models.DateTimeField(
+        verbose_name='Дата добавления',
+        auto_now_add=True,
+        db_index=True,
+    )
 
     def __str__(self):
         return (f'{self.recipe.name}'
@@ -206,26 +276,52 @@ class Purchase(models.Model):
     class Meta:
         verbose_name = 'Покупка'
         verbose_name_plural = 'Покупки'
-        ordering = ('recipe__name',)
+        ordering = ('-id',)
+        indexes = [
+            models.Index(fields=['user', 'recipe'],
+                         name='recipes_purchase_user_idx'),
+        ]
+
+    @classmethod
+    def get_purchase_list(cls, user):
+        return RecipeIngredient.objects.filter(
+            recipe__in_purchase_list__user=user
+        ).values(
+            'ingredient__name', 'ingredient__measurement_unit'
+        ).annotate(
+            total_amount=Sum('amount')
+        ).order_by('ingredient__name', 'ingredient__measurement_unit')
 
     @classmethod
-    def get_purchase_list(cls, purchase_queryset):
-        purchase_list = {}
-        for purchase in purchase_queryset:
-            ingredients = RecipeIngredient.objects.filter(
-                recipe=purchase.recipe
-            ).prefetch_related('ingredient')
-
-            for ingredient in ingredients:
-                name = ingredient.ingredient.name
-                measurement_unit = ingredient.ingredient.measurement_unit
-                amount = ingredient.amount
-                if ingredient.ingredient.name in purchase_list:
-                    purchase_list[name]['amount'] += amount
-                else:
-                    purchase_list[name] = {
-                        'measurement_unit': measurement_unit,
-                        'amount': amount
-                    }
-
-        return purchase_list
+    def get_purchase_list_etag(cls, user):
+        fingerprint = hashlib.md5()
+        for line in cls.get_purchase_list(user).iterator():
+            fingerprint.update(repr(sorted(line.items())).encode())
+        return fingerprint.hexdigest()
+
+
+class RecipeRanking(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        verbose_name='Рецепт',
+        related_name='ranking',
+        primary_key=True,
+        on_delete=models.CASCADE,
+    )
+    score = models.FloatField(
+        verbose_name='Популярность',
+        default=0,
+    )
+    refreshed_at = models.DateTimeField(
+        verbose_name='Дата пересчёта',
+    )
+
+    def __str__(self):
+        return f'{self.recipe_id}: {self.score:.3f}'
+
+    class Meta:
+        verbose_name = 'Рейтинг рецепта'
+        verbose_name_plural = 'Рейтинги рецептов'
+        indexes = [
+            models.Index(fields=['-score'], name='recipes_ranking_score_idx'),
+        ]
@@ -1,13 +1,47 @@
-from django.shortcuts import get_object_or_404
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
 from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
 from rest_framework import serializers
 from users.serializers import CustomUserSerializer
 
+from . import cache
 from .filters import purchase_recipe_limit_filter
+from .images import get_variant_urls
 from .models import (Favorite, Ingredient, Purchase, Recipe, RecipeIngredient,
                      Tag, User)
 
 
+class RecipeImageField(Base64ImageField):
+
+    def to_internal_value(self, data):
+        if not isinstance(data, UploadedFile):
+            return super().to_internal_value(data)
+
+        if data.size > settings.RECIPE_IMAGE_MAX_SIZE:
+            raise serializers.ValidationError(
+                'Размер изображения не должен превышать '
+                f'{settings.RECIPE_IMAGE_MAX_SIZE // 2 ** 20} МБ.'
+            )
+        try:
+            with Image.open(data) as image:
+                width, height = image.size
+        except (OSError, ValueError):
+            raise serializers.ValidationError(self.INVALID_FILE_MESSAGE)
+        data.seek(0)
+        max_dimension = settings.RECIPE_IMAGE_MAX_DIMENSION
+        if width > max_dimension or height > max_dimension:
+            raise serializers.ValidationError(
+                'Размер изображения не должен превышать '
+                f'{max_dimension}x{max_dimension} пикселей.'
+            )
+        return serializers.ImageField.to_internal_value(self, data)
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
@@ -45,6 +79,13 @@ class ListRecipeIngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'amount', 'name', 'measurement_unit')
 
 
+class CachedRecipeListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        return self.child.to_cached_representation(list(iterable))
+
+
 class RecipeListSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True)
     ingredients = ListRecipeIngredientSerializer(source='recipeingredient_set',
@@ -54,28 +95,66 @@ class RecipeListSerializer(serializers.ModelSerializer):
     is_in_shopping_cart = serializers.SerializerMethodField(
         'recipe_is_in_shopping_cart'
     )
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        exclude = ('pub_date',)
+        exclude = ('pub_date', 'favorites_count', 'purchases_count')
+        list_serializer_class = CachedRecipeListSerializer
+
+    def to_representation(self, instance):
+        return self.to_cached_representation([instance])[0]
+
+    def to_cached_representation(self, instances):
+        host = self.context['request'].get_host()
+        cached = cache.get_recipes([obj.id for obj in instances], host)
+        missing = [obj for obj in instances if obj.id not in cached]
+        if missing:
+            prefetch_related_objects(missing, 'tags',
+                                     'recipeingredient_set__ingredient')
+            representations = {
+                obj.id: super(RecipeListSerializer,
+                              self).to_representation(obj)
+                for obj in missing
+            }
+            cache.set_recipes(representations, host)
+            cached.update(representations)
+
+        return [self.add_user_fields(obj, cached[obj.id]) for obj in instances]
+
+    def add_user_fields(self, obj, representation):
+        data = dict(representation)
+        data['author'] = dict(
+            data['author'],
+            is_subscribed=self.fields['author'].user_is_subscribed(obj.author)
+        )
+        data['is_favorited'] = self.recipe_is_favorited(obj)
+        data['is_in_shopping_cart'] = self.recipe_is_in_shopping_cart(obj)
+        return data
+
+    def get_image_variants(self, obj):
+        return get_variant_urls(obj.image_variants,
+                                self.context.get('request'))
 
     def recipe_is_favorited(self, obj):
-        recipe = get_object_or_404(Recipe, id=obj.id)
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context['request'].user
         if user.is_anonymous:
             return False
-        return Favorite.objects.filter(recipe=recipe, user=user).exists()
+        return Favorite.objects.filter(recipe=obj, user=user).exists()
 
     def recipe_is_in_shopping_cart(self, obj):
-        recipe = get_object_or_404(Recipe, id=obj.id)
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context['request'].user
         if user.is_anonymous:
             return False
-        return Purchase.objects.filter(recipe=recipe, user=user).exists()
+        return Purchase.objects.filter(recipe=obj, user=user).exists()
 
 
 class RecipeSerializer(serializers.ModelSerializer):
-    image = Base64ImageField(max_length=None, use_url=True)
+    image = RecipeImageField(max_length=None, use_url=True)
     ingredients = RecipeIngredientSerializer(source='recipeingredient_set',
                                              many=True)
     tags = serializers.PrimaryKeyRelatedField(queryset=Tag.objects.all(),
@@ -83,73 +162,128 @@ class RecipeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Recipe
-        exclude = ('id', 'author')
+        exclude = ('id', 'author', 'image_variants', 'favorites_count',
+                   'purchases_count')
+
+    def validate_ingredients(self, ingredients):
+        ids = [ingredient.get('id') for ingredient in ingredients]
+        found = Ingredient.objects.in_bulk(set(ids))
+
+        errors = []
+        missing = sorted(set(ids) - set(found))
+        if missing:
+            errors.append(f'Ингредиенты не найдены: {missing}.')
+        duplicates = sorted(
+            pk for pk, count in Counter(ids).items() if count > 1
+        )
+        if duplicates:
+            errors.append(f'Ингредиенты указаны повторно: {duplicates}.')
+        bad_amounts = sorted({
+            ingredient.get('id') for ingredient in ingredients
+            if ingredient.get('amount') < 1
+        })
+        if bad_amounts:
+            errors.append(
+                'Убедитесь, что количество больше либо равно 1 '
+                f'для ингредиентов: {bad_amounts}.'
+            )
+        if errors:
+            raise serializers.ValidationError(errors)
+        return ingredients
+
+    @staticmethod
+    def create_ingredients(recipe, ingredients):
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient.get('id'),
+                amount=ingredient.get('amount'),
+            )
+            for ingredient in ingredients
+        )
 
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('recipeingredient_set')
         author = self.context.get('request').user
-        recipe = Recipe(author=author, **validated_data)
-
-        recipe_ingredient_list = []
-        for ingredient in ingredients:
-            amount = ingredient.get('amount')
-            if amount < 1:
-                raise serializers.ValidationError(
-                    'Убедитесь, что это значение больше либо равно 1.'
-                )
-
-            ingredient_instance = get_object_or_404(Ingredient,
-                                                    id=ingredient.get('id'))
-            recipe_ingredient_list.append(RecipeIngredient(
-                recipe=recipe,
-                ingredient=ingredient_instance,
-                amount=amount
-            ))
-
-        recipe.save()
+        recipe = Recipe.objects.create(author=author, **validated_data)
         recipe.tags.set(tags)
-        RecipeIngredient.objects.bulk_create(recipe_ingredient_list)
+        self.create_ingredients(recipe, ingredients)
 
         return recipe
 
+    @staticmethod
+    def update_ingredients(recipe, ingredients):
+        current = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipeingredient_set.all()
+        }
+        submitted = {
+            ingredient.get('id'): ingredient.get('amount')
+            for ingredient in ingredients
+        }
+
+        removed = [recipe_ingredient.id
+                   for ingredient_id, recipe_ingredient in current.items()
+                   if ingredient_id not in submitted]
+        changed = []
+        for ingredient_id, amount in submitted.items():
+            recipe_ingredient = current.get(ingredient_id)
+            if recipe_ingredient is not None and (
+                    recipe_ingredient.amount != amount):
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        added = [ingredient for ingredient in ingredients
+                 if ingredient.get('id') not in current]
+
+        if removed:
+            RecipeIngredient.objects.filter(id__in=removed).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+        if added:
+            RecipeSerializer.create_ingredients(recipe, added)
+        return bool(removed or changed or added)
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        tags = validated_data.pop('tags')
-        ingredients = validated_data.pop('recipeingredient_set')
-
-        recipe_ingredient_list = []
-        for ingredient in ingredients:
-            amount = ingredient.get('amount')
-            if amount < 1:
-                raise serializers.ValidationError(
-                    'Убедитесь, что это значение больше либо равно 1.'
-                )
-            ingredient_instance = get_object_or_404(Ingredient,
-                                                    id=ingredient.get('id'))
-            recipe_ingredient_list.append(RecipeIngredient(
-                recipe=instance,
-                ingredient=ingredient_instance,
-                amount=amount
-            ))
-
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-        instance.name = validated_data.get('name')
-        if validated_data.get('image') is not None:
-            instance.image = validated_data.get('image')
-        instance.text = validated_data.get('text')
-        instance.cooking_time = validated_data.get('cooking_time')
-        instance.save()
-        instance.tags.set(tags)
-        RecipeIngredient.objects.bulk_create(recipe_ingredient_list)
-
+        tags = validated_data.pop('tags', None)
+        ingredients = validated_data.pop('recipeingredient_set', None)
+        changed = False
+
+        if ingredients is not None:
+            changed = self.update_ingredients(instance, ingredients)
+
+        if tags is not None and (
+                {tag.id for tag in tags}
+                != {tag.id for tag in instance.tags.all()}):
+            instance.tags.set(tags)
+            changed = True
+
+        update_fields = []
+        for field, value in validated_data.items():
+            if field == 'image' or getattr(instance, field) != value:
+                setattr(instance, field, value)
+                update_fields.append(field)
+        if update_fields:
+            instance.save(update_fields=update_fields)
+            changed = True
+
+        if changed:
+            transaction.on_commit(cache.bump_version)
         return instance
 
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
+
+    def get_image_variants(self, obj):
+        return get_variant_urls(obj.image_variants,
+                                self.context.get('request'))
 
 
 class SubscriptionSerializer(CustomUserSerializer):
@@ -162,12 +296,14 @@ class SubscriptionSerializer(CustomUserSerializer):
                   'last_name', 'is_subscribed', 'recipes', 'recipes_count')
 
     def count_recipes(self, user):
-        return user.recipes.count()
+        return user.recipes_count
 
     def recipes_limit(self, user):
-        recipes_query = user.recipes.all()
-        recipes_query = purchase_recipe_limit_filter(
-            self.context.get('request'),
-            recipes_query
-        )
+        if hasattr(user, 'limited_recipes'):
+            recipes_query = user.limited_recipes
+        else:
+            recipes_query = purchase_recipe_limit_filter(
+                self.context.get('request'),
+                user.recipes.all()
+            )
         return RecipeMinifiedSerializer(recipes_query, many=True).data
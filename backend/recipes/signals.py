@@ -0,0 +1,84 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import INGREDIENTS_VERSION_KEY, bump_version, invalidate_tag_slugs
+from .counters import change_instance_counters
+from .images import schedule_image_processing, schedule_variant_removal
+from .models import (Favorite, Ingredient, Purchase, Recipe, RecipeIngredient,
+                     Subscription, Tag, User)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_recipe_cache(sender, **kwargs):
+    transaction.on_commit(bump_version)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_cache_on_tags_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=User)
+def invalidate_recipe_cache_on_author_change(sender, created,
+                                             update_fields=None, **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_catalog(sender, **kwargs):
+    transaction.on_commit(partial(bump_version, INGREDIENTS_VERSION_KEY))
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(sender, instance, update_fields=None, **kwargs):
+    if not instance.image or (update_fields is not None
+                              and 'image' not in update_fields):
+        return
+    transaction.on_commit(
+        partial(schedule_image_processing, instance.image.name)
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_image_variants(sender, instance, **kwargs):
+    if instance.image_variants:
+        transaction.on_commit(
+            partial(schedule_variant_removal, instance.image_variants)
+        )
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Purchase)
+@receiver(post_save, sender=Subscription)
+def count_created_relation(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_instance_counters(instance, 1)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Purchase)
+@receiver(post_delete, sender=Subscription)
+def count_deleted_relation(sender, instance, **kwargs):
+    change_instance_counters(instance, -1)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_slug_map(sender, **kwargs):
+    transaction.on_commit(invalidate_tag_slugs)
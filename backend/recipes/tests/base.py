@@ -0,0 +1,77 @@
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from ..models import (Favorite, Ingredient, Purchase, Recipe, RecipeIngredient,
+                      Subscription, Tag, User)
+
+DUMMY_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+LOCMEM_CACHE = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@override_settings(
+    ALLOWED_HOSTS=['testserver'],
+    CACHES={alias: DUMMY_CACHE
+            for alias in ('default', 'recipes', 'auth', 'metrics')},
+)
+class FoodramTestCase(APITestCase):
+
+    @classmethod
+    def create_user(cls, number):
+        return User.objects.create_user(
+            email=f'user{number}@example.com',
+            username=f'user{number}',
+            first_name='Имя',
+            last_name=f'Фамилия {number}',
+            password='password',
+        )
+
+    @classmethod
+    def create_recipes(cls, count, authors, tags, ingredients):
+        recipes = []
+        for number in range(count):
+            recipe = Recipe.objects.create(
+                author=authors[number % len(authors)],
+                name=f'Рецепт {number}',
+                image='recipes/test.jpg',
+                text='Описание',
+                cooking_time=10,
+            )
+            recipe.tags.set(tags[:1 + number % len(tags)])
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe=recipe, ingredient=ingredient,
+                                 amount=number + 1)
+                for ingredient in ingredients[:1 + number % 3]
+            )
+            recipes.append(recipe)
+        return recipes
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = cls.create_user(0)
+        cls.authors = [cls.create_user(number) for number in range(1, 4)]
+        cls.tags = [
+            Tag.objects.create(name=f'Тег {number}', color=f'#00000{number}',
+                               slug=f'tag-{number}')
+            for number in range(3)
+        ]
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(40)
+        )
+        cls.ingredients = list(Ingredient.objects.order_by('pk'))
+        cls.recipes = cls.create_recipes(30, cls.authors, cls.tags,
+                                         cls.ingredients)
+        for recipe in cls.recipes[::2]:
+            Favorite.objects.create(user=cls.user, recipe=recipe)
+        for recipe in cls.recipes[::3]:
+            Purchase.objects.create(user=cls.user, recipe=recipe)
+        for author in cls.authors[:2]:
+            Subscription.objects.create(user=cls.user, author=author)
+
+    def get_client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            token, created = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+from common.asgi import ASGIHandler
+from common.async_views import AsyncDefaultRouter, async_view
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.asyncio import async_unsafe
+
+from ..urls import router
+
+
+class AsyncViewsTest(SimpleTestCase):
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_only_read_routes_are_async(self):
+        async_router = AsyncDefaultRouter()
+        async_router.registry = list(router.registry)
+        names = {
+            url.name for url in async_router.get_urls()
+            if asyncio.iscoroutinefunction(url.callback)
+        }
+        self.assertEqual(names, {
+            'recipes-list', 'recipes-detail', 'tags-list', 'tags-detail',
+            'ingredients-list', 'ingredients-detail', 'users-subscriptions',
+        })
+
+    def test_writes_bypass_read_executor(self):
+        def view(request):
+            return HttpResponse(threading.current_thread().name)
+
+        wrapper = async_to_sync(async_view(view))
+        factory = RequestFactory()
+        self.assertTrue(wrapper(factory.get('/')).content.startswith(
+            b'async-views'
+        ))
+        self.assertFalse(wrapper(factory.post('/')).content.startswith(
+            b'async-views'
+        ))
+
+    def test_streaming_response_is_read_outside_event_loop(self):
+        @async_unsafe
+        def read_part(number):
+            return f'{number}\n'
+
+        response = StreamingHttpResponse(read_part(number)
+                                         for number in range(3))
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(ASGIHandler().send_response)(response, send)
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertEqual([message.get('body') for message in messages[1:]],
+                         [b'0\n', b'1\n', b'2\n', None])
@@ -0,0 +1,42 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .base import DUMMY_CACHE, LOCMEM_CACHE, FoodramTestCase
+
+
+@override_settings(CACHES={
+    'default': DUMMY_CACHE,
+    'recipes': DUMMY_CACHE,
+    'auth': dict(LOCMEM_CACHE, LOCATION='test-auth'),
+    'metrics': DUMMY_CACHE,
+})
+class CachedTokenAuthenticationTest(FoodramTestCase):
+    url = '/api/users/me/'
+
+    def setUp(self):
+        self.client = self.get_client(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_warm_cache_needs_no_auth_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['email'], self.user.email)
+        self.assertEqual([
+            query['sql'] for query in queries
+            if 'authtoken_token' in query['sql']
+        ], [])
+
+    def test_logout_revokes_cached_token(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deactivation_revokes_cached_token(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
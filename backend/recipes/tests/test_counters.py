@@ -0,0 +1,31 @@
+from ..counters import rebuild_counters
+from ..models import Favorite, Purchase
+from .base import FoodramTestCase
+
+
+class CountersTest(FoodramTestCase):
+
+    def assert_no_drift(self):
+        self.assertFalse(any(rebuild_counters(fix=False).values()))
+
+    def test_counters_follow_api_actions(self):
+        client = self.get_client(self.authors[2])
+        recipe = self.recipes[0]
+        client.get(f'/api/recipes/{recipe.id}/favorite/')
+        client.get(f'/api/recipes/{recipe.id}/shopping_cart/')
+        client.get(f'/api/users/{self.user.id}/subscribe/')
+        self.assert_no_drift()
+
+        client.delete(f'/api/recipes/{recipe.id}/favorite/')
+        client.delete(f'/api/users/{self.user.id}/subscribe/')
+        self.assert_no_drift()
+
+    def test_counters_follow_direct_and_cascade_deletes(self):
+        Favorite.objects.filter(recipe=self.recipes[0]).delete()
+        Purchase.objects.filter(user=self.user)[:1].get().delete()
+        self.assert_no_drift()
+
+        self.user.delete()
+        self.assert_no_drift()
+        self.authors[0].delete()
+        self.assert_no_drift()
@@ -0,0 +1,95 @@
+from django.test import override_settings
+
+from ..cache import INGREDIENTS_VERSION_KEY, bump_version
+from ..catalog import IngredientCatalog, fold_name, ingredient_catalog
+from ..filters import IngredientSearchFilter
+from ..models import Ingredient
+from .base import DUMMY_CACHE, LOCMEM_CACHE, FoodramTestCase
+
+
+class IngredientSearchTest(FoodramTestCase):
+    url = '/api/ingredients/'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit='г')
+            for name in ('Salt', 'sea salt', 'Salted butter', 'Straße')
+        )
+
+    def get_names(self, params):
+        response = self.get_client().get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [ingredient['name'] for ingredient in response.data]
+
+    def test_prefix_matches_come_before_substrings(self):
+        self.assertEqual(self.get_names({'name': 'SALT'}),
+                         ['Salt', 'Salted butter', 'sea salt'])
+
+    def test_catalog_and_database_fold_case_alike(self):
+        for term in ('SALT', 'straße', 'STRASSE', 'ингредиент 1'):
+            with self.subTest(term=term):
+                self.assertEqual(
+                    self.get_names({'name': term}),
+                    self.get_names({'name': term, 'fuzzy': 1}),
+                )
+                self.assertEqual(
+                    [ingredient.name for ingredient in
+                     ingredient_catalog.search(term, 50)],
+                    self.get_names({'name': term}),
+                )
+        self.assertEqual(self.get_names({'name': 'STRASSE'}), [])
+
+    def test_full_prefix_page_skips_substring_query(self):
+        search_filter = IngredientSearchFilter()
+        search_filter.result_limit = 10
+        with self.assertNumQueries(1):
+            found = search_filter.search(Ingredient.objects.all(),
+                                         'ингредиент')
+        self.assertEqual(len(found), 10)
+
+
+@override_settings(CACHES={
+    'default': DUMMY_CACHE,
+    'recipes': dict(LOCMEM_CACHE, LOCATION='test-catalog'),
+    'auth': DUMMY_CACHE,
+    'metrics': DUMMY_CACHE,
+})
+class IngredientCatalogTest(FoodramTestCase):
+
+    def setUp(self):
+        self.catalog = IngredientCatalog()
+        self.catalog.get_snapshot()
+
+    def test_search_reloads_only_on_version_change(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.catalog.search('ингредиент', 5)), 5)
+
+        Ingredient.objects.create(name='Новый ингредиент',
+                                  measurement_unit='г')
+        with self.assertNumQueries(0):
+            self.assertNotIn('Новый ингредиент', [
+                ingredient.name
+                for ingredient in self.catalog.search('новый', 5)
+            ])
+
+        bump_version(INGREDIENTS_VERSION_KEY)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [ingredient.name
+                 for ingredient in self.catalog.search('новый', 5)],
+                ['Новый ингредиент'],
+            )
+
+    def test_substring_index_matches_scan(self):
+        names = [fold_name(ingredient.name)
+                 for ingredient in Ingredient.objects.order_by('name')]
+        for term in ('и', 'ент 1', 'т 3', '39', 'дие', 'нет такого'):
+            with self.subTest(term=term):
+                expected = sorted(name for name in names if term in name)
+                found = sorted(
+                    fold_name(ingredient.name)
+                    for ingredient in self.catalog.search(term, 100)
+                )
+                self.assertEqual(found, expected)
@@ -0,0 +1,53 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Exists, OuterRef
+
+from ..models import Purchase, Recipe, User
+from .base import FoodramTestCase
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Планы запросов SQLite')
+class QueryPlanTest(FoodramTestCase):
+    feed_ordering = ('-pub_date', '-id')
+
+    def assert_uses_index(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f'INDEX {index}', plan)
+        return plan
+
+    def test_feed_is_read_in_index_order(self):
+        plan = self.assert_uses_index(
+            Recipe.objects.with_user_flags(self.user).order_by(
+                *self.feed_ordering
+            )[:10],
+            'recipes_recipe_pub_date_idx',
+        )
+        self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_author_filter_uses_author_index(self):
+        plan = self.assert_uses_index(
+            Recipe.objects.filter(author=self.authors[0]).order_by(
+                *self.feed_ordering
+            )[:10],
+            'recipes_recipe_author_idx',
+        )
+        self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_subscriptions_use_user_index(self):
+        self.assert_uses_index(
+            User.objects.filter(following__user=self.user),
+            'recipes_subscription_user_idx',
+        )
+
+    def test_cart_filter_uses_user_index(self):
+        self.assert_uses_index(
+            Recipe.objects.filter(Exists(Purchase.objects.filter(
+                user=self.user, recipe_id=OuterRef('pk')
+            ))).order_by(*self.feed_ordering)[:10],
+            'recipes_purchase_user_idx',
+        )
+
+    def test_shopping_list_uses_user_index(self):
+        self.assert_uses_index(Purchase.get_purchase_list(self.user),
+                               'recipes_purchase_user_idx')
@@ -0,0 +1,65 @@
+from django.test import override_settings
+
+from .. import cache
+from ..models import Favorite
+from .base import DUMMY_CACHE, LOCMEM_CACHE, FoodramTestCase
+
+
+@override_settings(CACHES={
+    'default': DUMMY_CACHE,
+    'recipes': dict(LOCMEM_CACHE, LOCATION='test-recipes'),
+    'auth': DUMMY_CACHE,
+    'metrics': DUMMY_CACHE,
+})
+class RecipeCacheTest(FoodramTestCase):
+    url = '/api/recipes/'
+    params = {'limit': 10}
+
+    def setUp(self):
+        cache.get_recipe_cache().clear()
+
+    def get_lookups(self):
+        stats = cache.get_stats()
+        return stats['hits'], stats['misses']
+
+    def test_second_request_is_served_from_cache(self):
+        client = self.get_client()
+        hits, misses = self.get_lookups()
+        first = client.get(self.url, self.params).data['results']
+        self.assertEqual(self.get_lookups(), (hits, misses + 10))
+
+        with self.assertNumQueries(2):
+            second = client.get(self.url, self.params).data['results']
+        self.assertEqual(second, first)
+        self.assertEqual(self.get_lookups(), (hits + 10, misses + 10))
+
+    def test_recipe_change_bumps_version(self):
+        client = self.get_client()
+        recipe_id = client.get(self.url, self.params).data['results'][0]['id']
+        version = cache.get_version()
+
+        recipe = self.recipes[-1]
+        self.assertEqual(recipe.id, recipe_id)
+        recipe.name = 'Переименованный рецепт'
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.save(update_fields=['name'])
+        self.assertNotEqual(cache.get_version(), version)
+
+        results = client.get(self.url, self.params).data['results']
+        self.assertEqual(results[0]['name'], 'Переименованный рецепт')
+
+    def test_user_flags_are_not_cached(self):
+        recipe = self.recipes[-1]
+        self.assertFalse(Favorite.objects.filter(user=self.authors[0],
+                                                 recipe=recipe).exists())
+        Favorite.objects.get_or_create(user=self.user, recipe=recipe)
+
+        favorited = self.get_client(self.user).get(
+            self.url, self.params
+        ).data['results'][0]
+        other = self.get_client(self.authors[0]).get(
+            self.url, self.params
+        ).data['results'][0]
+        self.assertEqual(favorited['id'], recipe.id)
+        self.assertTrue(favorited['is_favorited'])
+        self.assertFalse(other['is_favorited'])
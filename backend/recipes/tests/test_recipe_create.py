@@ -0,0 +1,69 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.test import override_settings
+from PIL import Image
+
+from ..models import Ingredient, Recipe
+from .base import FoodramTestCase
+
+
+def get_image_data():
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2)).save(buffer, 'PNG')
+    return 'data:image/png;base64,{0}'.format(
+        base64.b64encode(buffer.getvalue()).decode()
+    )
+
+
+class RecipeCreateTest(FoodramTestCase):
+    url = '/api/recipes/'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def get_payload(self, ingredients):
+        return {
+            'name': 'Новый рецепт',
+            'text': 'Описание',
+            'cooking_time': 15,
+            'image': get_image_data(),
+            'tags': [self.tags[0].id],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 10}
+                for ingredient in ingredients
+            ],
+        }
+
+    def test_create_queries_do_not_grow_with_ingredients(self):
+        client = self.get_client(self.user)
+        for count in (3, 30):
+            payload = self.get_payload(self.ingredients[:count])
+            with self.subTest(ingredients=count), self.assertNumQueries(13):
+                response = client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, 201)
+            recipe = Recipe.objects.latest('id')
+            self.assertEqual(recipe.ingredients.count(), count)
+
+    def test_deleted_ingredient_is_rejected(self):
+        ingredient = Ingredient.objects.create(name='удалённый ингредиент',
+                                               measurement_unit='г')
+        payload = self.get_payload([self.ingredients[0], ingredient])
+        ingredient.delete()
+
+        response = self.get_client(self.user).post(self.url, payload,
+                                                   format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ingredients', response.data)
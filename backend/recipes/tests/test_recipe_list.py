@@ -0,0 +1,200 @@
+from common.pagination import CachedCountPaginator
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Favorite, Recipe
+from .base import DUMMY_CACHE, LOCMEM_CACHE, FoodramTestCase
+
+
+class RecipeListQueriesTest(FoodramTestCase):
+    url = '/api/recipes/'
+    page_sizes = (5, 25)
+
+    def assert_list_queries(self, client, expected):
+        for limit in self.page_sizes:
+            with self.subTest(limit=limit), self.assertNumQueries(expected):
+                response = client.get(self.url, {'limit': limit})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), limit)
+
+    def test_anonymous_list_queries_do_not_grow_with_page_size(self):
+        self.assert_list_queries(self.get_client(), 5)
+
+    def test_authenticated_list_queries_do_not_grow_with_page_size(self):
+        self.assert_list_queries(self.get_client(self.user), 7)
+
+
+class RecipeListCursorTest(FoodramTestCase):
+    url = '/api/recipes/'
+
+    def test_cursor_pages_follow_feed_order(self):
+        client = self.get_client()
+        expected = [recipe['id'] for recipe in client.get(
+            self.url, {'limit': 30}
+        ).data['results']]
+
+        received = []
+        response = client.get(self.url, {'cursor': '', 'limit': 7})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            received.extend(
+                recipe['id'] for recipe in response.data['results']
+            )
+            if response.data['next'] is None:
+                break
+            response = client.get(response.data['next'])
+        self.assertEqual(received, expected)
+
+    def test_ordering_is_rejected_in_cursor_mode(self):
+        response = self.get_client().get(
+            self.url, {'cursor': '', 'ordering': '-favorites_count'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+
+
+@override_settings(CACHES={
+    'default': LOCMEM_CACHE,
+    'recipes': LOCMEM_CACHE,
+    'auth': DUMMY_CACHE,
+    'metrics': DUMMY_CACHE,
+})
+class RecipeListCountTest(FoodramTestCase):
+    url = '/api/recipes/'
+
+    def test_favorites_count_follows_user_actions(self):
+        client = self.get_client(self.user)
+        params = {'is_favorited': 1, 'limit': 10}
+        favorites = Favorite.objects.filter(user=self.user).count()
+        self.assertEqual(client.get(self.url, params).data['count'],
+                         favorites)
+
+        recipe = self.recipes[1]
+        response = client.get(f'{self.url}{recipe.id}/favorite/')
+        self.assertEqual(response.status_code, 201)
+
+        response = client.get(self.url, {**params, 'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], favorites + 1)
+        self.assertEqual(len(response.data['results']), favorites + 1 - 10)
+
+    def test_new_recipe_is_listed_with_cached_count(self):
+        client = self.get_client()
+        author = self.authors[0]
+        params = {'author': author.id, 'limit': 20}
+        before = client.get(self.url, params).data
+        self.assertEqual(before['count'], len(before['results']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = Recipe.objects.create(
+                author=author, name='Новый рецепт', image='',
+                text='Описание', cooking_time=5,
+            )
+
+        response = client.get(self.url, params)
+        self.assertEqual(response.data['count'], before['count'] + 1)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [recipe.id] + [item['id'] for item in before['results']],
+        )
+
+    def test_stale_count_does_not_cut_rows(self):
+        queryset = Recipe.objects.order_by('-pub_date', '-id')
+        total = queryset.count()
+        cache.set('stale-count', (total - 5, True))
+
+        paginator = CachedCountPaginator(queryset, 10,
+                                         count_cache_key='stale-count')
+        page = paginator.page(3)
+        self.assertEqual(list(page), list(queryset[20:30]))
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.count, total)
+        self.assertEqual(cache.get('stale-count'), (total, True))
+
+
+class RecipeListFilterTest(FoodramTestCase):
+    url = '/api/recipes/'
+
+    def get_ids(self, params, user=None):
+        response = self.get_client(user).get(self.url,
+                                             {**params, 'limit': 100})
+        self.assertEqual(response.status_code, 200)
+        ids = [recipe['id'] for recipe in response.data['results']]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(response.data['count'], len(ids))
+        return set(ids)
+
+    def get_recipe_ids(self, condition):
+        return {recipe.id for number, recipe in enumerate(self.recipes)
+                if condition(number)}
+
+    def test_tags_match_any(self):
+        self.assertEqual(
+            self.get_ids({'tags': ['tag-1', 'tag-2']}),
+            self.get_recipe_ids(lambda number: number % 3 != 0),
+        )
+
+    def test_tags_match_all(self):
+        self.assertEqual(
+            self.get_ids({'tags': ['tag-1', 'tag-2'], 'tags_match': 'all'}),
+            self.get_recipe_ids(lambda number: number % 3 == 2),
+        )
+        self.assertEqual(
+            self.get_ids({'tags': ['tag-1', 'unknown'], 'tags_match': 'all'}),
+            set(),
+        )
+
+    def test_is_favorited_combines_with_tags(self):
+        self.assertEqual(
+            self.get_ids({'is_favorited': 1, 'tags': ['tag-2']}, self.user),
+            self.get_recipe_ids(
+                lambda number: number % 2 == 0 and number % 3 == 2
+            ),
+        )
+        self.assertEqual(
+            self.get_ids({'is_favorited': 1, 'tags': ['tag-1', 'tag-2'],
+                          'tags_match': 'all'}, self.user),
+            self.get_recipe_ids(
+                lambda number: number % 2 == 0 and number % 3 == 2
+            ),
+        )
+
+    def test_is_favorited_combines_with_author(self):
+        self.assertEqual(
+            self.get_ids({'is_favorited': 1, 'author': self.authors[1].id},
+                         self.user),
+            self.get_recipe_ids(
+                lambda number: number % 2 == 0 and number % 3 == 1
+            ),
+        )
+
+    def test_is_in_shopping_cart_combines_with_tags(self):
+        in_cart = self.get_recipe_ids(lambda number: number % 3 == 0)
+        self.assertEqual(
+            self.get_ids({'is_in_shopping_cart': 1, 'tags': ['tag-0']},
+                         self.user),
+            in_cart,
+        )
+        self.assertEqual(
+            self.get_ids({'is_in_shopping_cart': 1, 'tags': ['tag-1']},
+                         self.user),
+            set(),
+        )
+
+    def test_user_filters_keep_view_queryset(self):
+        client = self.get_client(self.user)
+        params = {'is_favorited': 1, 'is_in_shopping_cart': 1,
+                  'tags': ['tag-0']}
+        query_counts = []
+        for limit in (2, 5):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(self.url, {**params, 'limit': limit})
+            self.assertEqual(len(response.data['results']), limit)
+            for recipe in response.data['results']:
+                self.assertTrue(recipe['is_favorited'])
+                self.assertTrue(recipe['is_in_shopping_cart'])
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
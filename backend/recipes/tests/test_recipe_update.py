@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import FoodramTestCase
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class RecipeUpdateTest(FoodramTestCase):
+
+    def setUp(self):
+        self.recipe = self.recipes[2]
+        self.url = f'/api/recipes/{self.recipe.id}/'
+        self.client = self.get_client(self.recipe.author)
+
+    def get_payload(self, **amounts):
+        return {
+            'name': self.recipe.name,
+            'text': self.recipe.text,
+            'cooking_time': self.recipe.cooking_time,
+            'tags': [tag.id for tag in self.recipe.tags.order_by('id')],
+            'ingredients': [
+                {'id': line.ingredient_id,
+                 'amount': amounts.get(str(line.ingredient_id), line.amount)}
+                for line in self.recipe.recipeingredient_set.order_by('id')
+            ],
+        }
+
+    def patch(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries
+                if query['sql'].lstrip().upper().startswith(WRITE_STATEMENTS)]
+
+    def test_identical_patch_writes_nothing(self):
+        self.assertEqual(self.patch(self.get_payload()), [])
+
+    def test_changed_amount_updates_one_line(self):
+        line = self.recipe.recipeingredient_set.order_by('id').first()
+        amount = line.amount + 1
+        writes = self.patch(
+            self.get_payload(**{str(line.ingredient_id): amount})
+        )
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith(
+            'UPDATE "recipes_recipeingredient"'
+        ))
+        line.refresh_from_db()
+        self.assertEqual(line.amount, amount)
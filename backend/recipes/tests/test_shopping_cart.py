@@ -0,0 +1,50 @@
+import json
+
+from ..models import Ingredient, Purchase, RecipeIngredient
+from .base import FoodramTestCase
+
+
+class ShoppingCartDownloadTest(FoodramTestCase):
+    url = '/api/recipes/download_shopping_cart/'
+
+    def test_not_modified_until_ingredient_is_renamed(self):
+        client = self.get_client(self.user)
+        etag = client.get(self.url)['ETag']
+
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        ingredient = self.ingredients[0]
+        ingredient.name = 'переименованный ингредиент'
+        ingredient.save()
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('переименованный ингредиент',
+                      b''.join(response.streaming_content).decode())
+
+    def test_lines_are_grouped_by_name_and_unit(self):
+        flour_grams, flour_cups = (
+            Ingredient.objects.create(name='мука', measurement_unit=unit)
+            for unit in ('г', 'стакан')
+        )
+        first, second = self.recipes[:2]
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=first, ingredient=flour_grams, amount=100),
+            RecipeIngredient(recipe=second, ingredient=flour_grams, amount=50),
+            RecipeIngredient(recipe=second, ingredient=flour_cups, amount=2),
+        ])
+        buyer = self.create_user(10)
+        for recipe in (first, second):
+            Purchase.objects.create(user=buyer, recipe=recipe)
+
+        response = self.get_client(buyer).get(self.url, {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        lines = json.loads(b''.join(response.streaming_content))
+        flour = [line for line in lines if line['name'] == 'мука']
+        self.assertEqual(flour, [
+            {'name': 'мука', 'measurement_unit': 'г', 'amount': 150},
+            {'name': 'мука', 'measurement_unit': 'стакан', 'amount': 2},
+        ])
+        self.assertEqual(len(lines), len({
+            (line['name'], line['measurement_unit']) for line in lines
+        }))
@@ -0,0 +1,21 @@
+from .base import FoodramTestCase
+
+
+class SubscriptionListTest(FoodramTestCase):
+    url = '/api/users/subscriptions/'
+
+    def test_recipes_limit_is_applied_per_author(self):
+        response = self.get_client(self.user).get(self.url,
+                                                  {'recipes_limit': 2})
+        self.assertEqual(response.status_code, 200)
+        for author in response.data['results']:
+            self.assertLessEqual(len(author['recipes']), 2)
+
+    def test_invalid_recipes_limit_is_rejected(self):
+        client = self.get_client(self.user)
+        for recipes_limit in ('abc', '-1', '1.5'):
+            with self.subTest(recipes_limit=recipes_limit):
+                response = client.get(self.url,
+                                      {'recipes_limit': recipes_limit})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('recipes_limit', response.data)
@@ -0,0 +1,73 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import Favorite, Purchase, RecipeRanking
+
+EVENT_WEIGHTS = (
+    (Favorite, 1.0),
+    (Purchase, 1.5),
+)
+
+MIN_SCORE = 0.01
+
+
+def get_decay(seconds):
+    half_life = settings.TRENDING_HALF_LIFE.total_seconds()
+    return 0.5 ** (seconds / half_life)
+
+
+def collect_scores(since, now):
+    scores = defaultdict(float)
+    for model, weight in EVENT_WEIGHTS:
+        events = model.objects.filter(
+            created__gt=since, created__lte=now
+        ).order_by().values_list('recipe_id', 'created')
+        for recipe_id, created in events.iterator():
+            scores[recipe_id] += weight * get_decay(
+                (now - created).total_seconds()
+            )
+    return scores
+
+
+@transaction.atomic
+def refresh_rankings(full=False, now=None):
+    now = now or timezone.now()
+    last_refresh = None
+    if not full:
+        last_refresh = RecipeRanking.objects.aggregate(
+            last_refresh=Max('refreshed_at')
+        )['last_refresh']
+
+    if last_refresh is None:
+        RecipeRanking.objects.all().delete()
+        since = now - settings.TRENDING_WINDOW
+    else:
+        RecipeRanking.objects.update(
+            score=F('score') * get_decay(
+                (now - last_refresh).total_seconds()
+            ),
+            refreshed_at=now,
+        )
+        since = last_refresh
+
+    scores = collect_scores(since, now)
+    rankings = RecipeRanking.objects.in_bulk(list(scores))
+    changed = []
+    created = []
+    for recipe_id, score in scores.items():
+        ranking = rankings.get(recipe_id)
+        if ranking is None:
+            created.append(RecipeRanking(recipe_id=recipe_id, score=score,
+                                         refreshed_at=now))
+        else:
+            ranking.score += score
+            changed.append(ranking)
+
+    RecipeRanking.objects.bulk_update(changed, ('score',), batch_size=1000)
+    RecipeRanking.objects.bulk_create(created, batch_size=1000)
+    RecipeRanking.objects.filter(score__lt=MIN_SCORE).delete()
+    return len(scores)
@@ -1,14 +1,24 @@
-from django.http.response import HttpResponse
-from rest_framework import filters, permissions, status, viewsets
+from common.pagination import CachedCountPagination
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db.models import BooleanField, F, Value
+from django.http.response import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
+from .cache import get_version
+from .catalog import ingredient_catalog
 from .custom_functions import get_create_delete_related_response
-from .filters import CustomFilter
+from .filters import (CustomFilter, IngredientSearchFilter,
+                      RecipeOrderingFilter, get_recipes_limit,
+                      recipes_limit_prefetch)
 from .models import (Favorite, Ingredient, Purchase, Recipe, Subscription, Tag,
                      User)
 from .permissions import CurrentUserOrAdminOrReadOnly
+from .renderers import SHOPPING_LIST_RENDERERS
 from .serializers import (IngredientSerializer, RecipeListSerializer,
                           RecipeMinifiedSerializer, RecipeSerializer,
                           SubscriptionSerializer, TagSerializer)
@@ -32,6 +42,8 @@ RESPONSE_MESSAGES = {
     },
 }
 
+PURCHASE_LIST_CHUNK_SIZE = 2000
+
 
 class TagsViewSet(viewsets.ModelViewSet):
     serializer_class = TagSerializer
@@ -43,7 +55,27 @@ class RecipesViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           CurrentUserOrAdminOrReadOnly)
+    filter_backends = (DjangoFilterBackend, RecipeOrderingFilter)
     filter_class = CustomFilter
+    ordering_fields = ('pub_date', 'favorites_count', 'purchases_count')
+    pagination_class = CachedCountPagination
+    uncached_count_params = ('is_favorited', 'is_in_shopping_cart')
+
+    @property
+    def cursor_ordering(self):
+        if self.action == 'trending':
+            return ('-trending_score', '-id')
+        return ('-pub_date', '-id')
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return Recipe.objects.with_user_flags(self.request.user)
+
+    def get_count_cache_version(self):
+        return get_version()
 
     def get_serializer_class(self):
         if self.request.method in ('GET',):
@@ -55,25 +87,43 @@ class RecipesViewSet(viewsets.ModelViewSet):
         context.update({'request': self.request})
         return context
 
-    @action(detail=False, permission_classes=[permissions.IsAuthenticated])
+    @action(detail=False)
+    def trending(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            ranking__isnull=False
+        ).annotate(
+            trending_score=F('ranking__score')
+        ).order_by('-trending_score', '-id')
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, permission_classes=[permissions.IsAuthenticated],
+            renderer_classes=SHOPPING_LIST_RENDERERS)
     def download_shopping_cart(self, request, *args, **kwargs):
         user = self.request.user
-        purchase_queryset = user.purchase_list.all()
-        purchase_list = Purchase.get_purchase_list(purchase_queryset)
-        result_purchase_list = []
-
-        for ingredient, unit in purchase_list.items():
-            result_purchase_list.append(
-                f"{ingredient} ({unit['measurement_unit']}) — {unit['amount']}"
-                + "\n"
-            )
+        renderer = request.accepted_renderer
+        etag = '"{0}-{1}"'.format(
+            Purchase.get_purchase_list_etag(user), renderer.format
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
 
-        filename = "Purchase_list.txt"
-        response = HttpResponse(result_purchase_list,
-                                content_type='text/plain')
+        purchase_list = Purchase.get_purchase_list(user).iterator(
+            chunk_size=PURCHASE_LIST_CHUNK_SIZE
+        )
+        filename = 'Purchase_list.{0}'.format(renderer.format)
+        response = StreamingHttpResponse(
+            renderer.stream(purchase_list),
+            content_type='{0}; charset={1}'.format(renderer.media_type,
+                                                   renderer.charset)
+        )
         response['Content-Disposition'] = (
             'attachment; filename={0}'.format(filename)
         )
+        response['ETag'] = etag
         return response
 
     @action(detail=True, methods=['GET', 'DELETE'],
@@ -97,11 +147,16 @@ class RecipesViewSet(viewsets.ModelViewSet):
 
 class SubscriptionViewSet(viewsets.GenericViewSet):
     permission_classes = (permissions.IsAuthenticated,)
+    cursor_ordering = ('username',)
 
     @action(detail=False)
     def subscriptions(self, request, *args, **kwargs):
         user = self.request.user
-        subscription = User.objects.filter(following__user=user)
+        subscription = User.objects.filter(following__user=user).annotate(
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).prefetch_related(
+            recipes_limit_prefetch(request)
+        ).order_by('username')
 
         page = self.paginate_queryset(subscription)
         if page is not None:
@@ -121,6 +176,7 @@ class SubscriptionViewSet(viewsets.GenericViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
 
         instance = get_object_or_404(User, pk=kwargs.get('pk'))
+        get_recipes_limit(request)
         return get_create_delete_related_response(
             request, Subscription, SubscriptionSerializer,
             RESPONSE_MESSAGES['Subscription'], author=instance)
@@ -129,6 +185,21 @@ class SubscriptionViewSet(viewsets.GenericViewSet):
 class IngredientsViewSet(viewsets.ModelViewSet):
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ['^name']
+    filter_backends = (IngredientSearchFilter,)
     pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        search = IngredientSearchFilter.get_search_term(request)
+        if not search:
+            return super().list(request, *args, **kwargs)
+
+        if request.query_params.get(IngredientSearchFilter.fuzzy_param):
+            ingredients = IngredientSearchFilter().search(
+                self.get_queryset(), search, fuzzy=True
+            )
+        else:
+            ingredients = ingredient_catalog.search(
+                search, IngredientSearchFilter.result_limit
+            )
+        serializer = self.get_serializer(ingredients, many=True)
+        return Response(serializer.data)
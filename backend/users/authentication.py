@@ -0,0 +1,30 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+def get_token_cache():
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def get_token_cache_key(key):
+    return 'auth-token:{0}'.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def invalidate_tokens(keys):
+    get_token_cache().delete_many([get_token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        cache_key = get_token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is not None:
+            return token.user, token
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, token)
+        return user, token
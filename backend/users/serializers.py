@@ -13,6 +13,8 @@ class CustomUserSerializer(serializers.ModelSerializer):
                   'last_name', 'is_subscribed')
 
     def user_is_subscribed(self, user):
+        if hasattr(user, 'is_subscribed'):
+            return user.is_subscribed
         curr_user = self.context.get('request').user
         if curr_user.is_anonymous:
             return False
@@ -17,4 +17,4 @@ do
     sleep 2
 done
 
-gunicorn foodram.wsgi --bind 0.0.0.0:8000
\ No newline at end of file
+gunicorn --config gunicorn.conf.py